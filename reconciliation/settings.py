@@ -78,6 +78,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Reconciliation workers write concurrently, wait on SQLite's write lock
+        # instead of failing after the default 5 seconds
+        "OPTIONS": {"timeout": 30},
     }
 }
 
@@ -138,6 +141,27 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 50,
 }
 
+# Number of background threads processing reconciliation jobs concurrently
+RECONCILIATION_WORKERS = int(os.environ.get("RECONCILIATION_WORKERS", 4))
+
+# Number of processes validating and reconciling CSV data outside the GIL, 0 keeps the work
+# inside the worker threads and "auto" uses one process per CPU
+_process_workers = os.environ.get("RECONCILIATION_PROCESS_WORKERS", "0")
+RECONCILIATION_PROCESS_WORKERS = (
+    os.cpu_count() or 1 if _process_workers == "auto" else int(_process_workers)
+)
+
+# Number of ReconciliationResult rows inserted per bulk_create batch
+RECONCILIATION_RESULT_BATCH_SIZE = int(os.environ.get("RECONCILIATION_RESULT_BATCH_SIZE", 1000))
+
+# Load each batch of results with COPY instead of bulk_create on PostgreSQL. Off by default,
+# ignored on other databases
+RECONCILIATION_COPY_RESULTS = os.environ.get("RECONCILIATION_COPY_RESULTS", "0") == "1"
+
+# Maximum number of queued jobs a worker thread takes at once. Larger batches amortize the
+# connection check between jobs but leave fewer jobs for the other workers to pick up
+RECONCILIATION_QUEUE_BATCH_SIZE = int(os.environ.get("RECONCILIATION_QUEUE_BATCH_SIZE", 1))
+
 
 import os
 
@@ -1,26 +1,63 @@
 import atexit
+import multiprocessing
+import os
 import signal
 import sys
 
 from django.apps import AppConfig
 
+# Management commands that never serve requests and so don't need the job processor
+NON_SERVING_COMMANDS = frozenset({"migrate", "makemigrations", "collectstatic", "test"})
+
+
+def stop_job_processor():
+    from .queue_manager import job_manager
+
+    job_manager.stop_processing()
+
+
+def shutdown_handler(signum=None, frame=None):
+    print("\nReceived shutdown signal, stopping job processor...")
+    stop_job_processor()
+    sys.exit(0)
+
+
+def should_start_job_processor(argv) -> bool:
+    if multiprocessing.parent_process() is not None:
+        # Reconciliation worker processes only run the engine, they never process the queue
+        return False
+
+    command = argv[1] if len(argv) > 1 else None
+    if command in NON_SERVING_COMMANDS:
+        return False
+
+    if command == "runserver" and "--noreload" not in argv and os.environ.get("RUN_MAIN") != "true":
+        # The autoreloader parent only watches files, the server runs in its child process
+        return False
+
+    return True
+
 
 class ReconciliationAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reconciliation_app"
 
     def ready(self):
+        from . import signals  # noqa: F401
+
+        if not should_start_job_processor(sys.argv):
+            return
+
         from .queue_manager import job_manager
 
         job_manager.start_processing()
 
-        def shutdown_handler(signum=None, frame=None):
-            print("\nReceived shutdown signal, stopping job processor...")
-            job_manager.stop_processing()
-            sys.exit(0)
+        if signal.getsignal(signal.SIGTERM) is shutdown_handler:
+            # Handlers are already installed, don't stack another atexit hook
+            return
 
         signal.signal(signal.SIGTERM, shutdown_handler)
         signal.signal(signal.SIGINT, shutdown_handler)
 
         # Register atexit handler as fallback
-        atexit.register(lambda: job_manager.stop_processing())
+        atexit.register(stop_job_processor)
@@ -1,7 +1,20 @@
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
 
 class DataValidationError(Exception):
     def __init__(self, message: str, errors: List[Dict[str, str]]) -> None:
         self.message = message
         self.errors = errors
+
+
+def error_details(
+    error_type: str, message: str, errors: Optional[List[Dict[str, str]]] = None
+) -> Dict[str, Any]:
+    """Structured value stored in ReconciliationJob.error_message"""
+    return {"type": error_type, "message": message, "errors": errors}
+
+
+def exception_details(exc: Exception) -> Dict[str, Any]:
+    return error_details(
+        type(exc).__name__, getattr(exc, "message", str(exc)), getattr(exc, "errors", None)
+    )
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-15 08:30
+
+import reconciliation_app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reconciliation_app', '0009_alter_reconciliationjob_error_message'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reconciliationjob',
+            name='error_message',
+            field=models.JSONField(blank=True, encoder=reconciliation_app.models.CompactJSONEncoder, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reconciliationjob',
+            name='result_summary',
+            field=models.JSONField(blank=True, encoder=reconciliation_app.models.CompactJSONEncoder, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reconciliationresult',
+            name='differences',
+            field=models.JSONField(blank=True, encoder=reconciliation_app.models.CompactJSONEncoder, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reconciliationresult',
+            name='source_row_data',
+            field=models.JSONField(blank=True, encoder=reconciliation_app.models.CompactJSONEncoder, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reconciliationresult',
+            name='target_row_data',
+            field=models.JSONField(blank=True, encoder=reconciliation_app.models.CompactJSONEncoder, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-15 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reconciliation_app', '0010_compact_json_encoder'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reconciliationjob',
+            index=models.Index(fields=['-created_at'], name='reconciliation_job_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-15 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reconciliation_app', '0011_reconciliationjob_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reconciliationresult',
+            index=models.Index(fields=['job', 'result_type', 'id'], name='reconciliation_result_type_idx'),
+        ),
+    ]
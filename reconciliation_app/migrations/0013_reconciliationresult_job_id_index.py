@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-15 09:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reconciliation_app', '0012_reconciliationresult_job_type_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reconciliationresult',
+            index=models.Index(fields=['job', 'id'], name='reconciliation_result_job_idx'),
+        ),
+        migrations.AlterField(
+            model_name='reconciliationresult',
+            name='job',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='results', to='reconciliation_app.reconciliationjob'),
+        ),
+    ]
@@ -1,44 +1,49 @@
-import csv
+import io
+import json
 import logging
+import multiprocessing
 import queue
 import threading
 import time
-from datetime import datetime
-from typing import Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from .exceptions import DataValidationError
+import django
+from django.conf import settings
+from django.db import close_old_connections, connection, models, transaction
+from django.utils import timezone
+
+from .exceptions import DataValidationError, exception_details
 from .models import ReconciliationJob, ReconciliationResult
-from .reconciliation_engine import ReconciliationEngine
+from .reconciliation_engine import ReconciliationEngine, run_reconciliation
 
 logger = logging.getLogger("reconciliation_app.queue")
 
+# Result columns written by the PostgreSQL COPY fast path
+COPY_RESULT_FIELDS = (
+    "job",
+    "result_type",
+    "source_row_data",
+    "target_row_data",
+    "match_key",
+    "differences",
+)
 
-class JobQueue:
-
-    _instance = None
-    _lock = threading.Lock()
 
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
+class JobQueue:
 
     def __init__(self):
-        if not self._initialized:
-            self._queue = queue.Queue()
-            self._initialized = True
+        # SimpleQueue's put/get are implemented in C and avoid the Python-level
+        # mutex and condition variables that queue.Queue takes on every operation
+        self._queue = queue.SimpleQueue()
 
     def submit_job(self, job_id: int) -> bool:
-        try:
-            self._queue.put(job_id, timeout=5)
-            logger.info(f"Job {job_id} submitted to queue")
-            return True
-        except queue.Full:
-            logger.error(f"Queue is full, cannot submit job {job_id}")
-            return False
+        # SimpleQueue is unbounded so put never blocks or raises queue.Full
+        self._queue.put(job_id)
+        logger.info(f"Job {job_id} submitted to queue")
+        return True
 
     def get_next_job(self, timeout: Optional[float] = None) -> Optional[int]:
         try:
@@ -46,8 +51,21 @@ class JobQueue:
         except queue.Empty:
             return None
 
+    def get_batch(self, max_items: int, timeout: Optional[float] = None) -> List[int]:
+        """Block for one job, then take up to max_items - 1 more that are already queued"""
+        job_id = self.get_next_job(timeout=timeout)
+        if job_id is None:
+            return []
+        batch = [job_id]
+        while len(batch) < max_items:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
     def mark_job_done(self):
-        self._queue.task_done()
+        """No-op kept for API compatibility, SimpleQueue does not track unfinished tasks"""
 
     def get_queue_size(self) -> int:
         return self._queue.qsize()
@@ -55,71 +73,110 @@ class JobQueue:
 
 class JobProcessor:
 
-    def __init__(self, job_queue: JobQueue):
+    def __init__(self, job_queue: JobQueue, num_workers: Optional[int] = None):
         self.job_queue = job_queue
+        self.num_workers = num_workers or getattr(settings, "RECONCILIATION_WORKERS", 1)
         self.is_running = False
-        self.worker_thread = None
+        self.worker_threads = []
+        self.process_pool = None
+        # The engine holds no per-job state so it is shared by all worker threads
         self.reconciliation_engine = ReconciliationEngine()
 
     def start(self):
         if not self.is_running:
             self.is_running = True
-            self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-            self.worker_thread.start()
-            logger.info("Job processor started")
+            # Each worker thread waits on at most one job, more processes would sit idle
+            num_processes = min(
+                getattr(settings, "RECONCILIATION_PROCESS_WORKERS", 0), self.num_workers
+            )
+            if num_processes > 0:
+                # CPU-bound reconciliation runs outside the GIL in spawned processes which
+                # set up Django themselves and never touch the parent's DB connections
+                self.process_pool = ProcessPoolExecutor(
+                    max_workers=num_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=django.setup,
+                )
+            self.worker_threads = [
+                threading.Thread(
+                    target=self._worker_loop, name=f"reconciliation-worker-{i}", daemon=True
+                )
+                for i in range(self.num_workers)
+            ]
+            for worker_thread in self.worker_threads:
+                worker_thread.start()
+            logger.info(f"Job processor started with {self.num_workers} worker(s)")
 
     def stop(self):
         logger.info("Stopping job processor...")
         self.is_running = False
-        if self.worker_thread and self.worker_thread.is_alive():
-            logger.info("Waiting for worker thread to finish current job...")
-            self.worker_thread.join(timeout=30)
-            if self.worker_thread.is_alive():
-                logger.warning("Worker thread did not stop gracefully within 30 seconds")
+        alive = [t for t in self.worker_threads if t.is_alive()]
+        if alive:
+            logger.info("Waiting for worker threads to finish current jobs...")
+            deadline = time.monotonic() + 30
+            for worker_thread in alive:
+                worker_thread.join(timeout=max(0.0, deadline - time.monotonic()))
+            if any(t.is_alive() for t in alive):
+                logger.warning("Worker threads did not stop gracefully within 30 seconds")
             else:
-                logger.info("Worker thread stopped gracefully")
+                logger.info("Worker threads stopped gracefully")
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=True, cancel_futures=True)
+            self.process_pool = None
         logger.info("Job processor stopped")
 
     def _worker_loop(self):
-        logger.info("Reconciliation Worker started")
+        logger.info(f"Reconciliation Worker {threading.current_thread().name} started")
 
-        while self.is_running:
-            try:
-                job_id = self.job_queue.get_next_job(timeout=1.0)
-                if job_id is not None:
-                    self._process_job(job_id)
-                    self.job_queue.mark_job_done()
-            except Exception as e:
-                logger.error(f"Error in worker loop: {e}")
-                time.sleep(1)
+        batch_size = max(1, getattr(settings, "RECONCILIATION_QUEUE_BATCH_SIZE", 1))
+        try:
+            while self.is_running:
+                pending = deque()
+                try:
+                    pending.extend(self.job_queue.get_batch(batch_size, timeout=1.0))
+                    if not pending:
+                        continue
+                    # Drop a broken or expired connection once per batch rather than per job
+                    close_old_connections()
+                    while pending:
+                        self._process_job(pending.popleft())
+                        self.job_queue.mark_job_done()
+                except Exception as e:
+                    logger.error(f"Error in worker loop: {e}")
+                    # The rest of the batch is already off the queue, put it back so those jobs
+                    # aren't left queued in the database forever
+                    for job_id in pending:
+                        self.job_queue.submit_job(job_id)
+                    time.sleep(1)
+        finally:
+            # Each thread owns its own database connection
+            connection.close()
 
     def _process_job(self, job_id: int):
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         try:
-            job = ReconciliationJob.objects.get(id=job_id)
+            job = ReconciliationJob.objects.select_related("ruleset").get(id=job_id)
             logger.info(
                 f"Starting job {job_id} - Ruleset: {job.ruleset.name if job.ruleset else 'None'}"
             )
 
+            ReconciliationJob.objects.filter(pk=job_id).update(
+                status="processing", updated_at=timezone.now()
+            )
             job.status = "processing"
-            job.save()
             logger.debug(f"Job {job_id} status updated to 'processing'")
 
-            logger.debug(f"Reading CSV files for job {job_id}")
-            source_data = self._read_csv_file(job.source_file_path)
-            target_data = self._read_csv_file(job.target_file_path)
-
-            if not source_data or not target_data:
-                raise ValueError("Failed to read CSV files")
-
             logger.info(
-                f"Job {job_id} - Source: {len(source_data)} records, Target: {len(target_data)} records"
+                f"Job {job_id} - Source: {job.source_record_count} records, "
+                f"Target: {job.target_record_count} records"
             )
 
-            logger.debug(f"Validating CSV data for job {job_id}")
-            validation_errors = self.reconciliation_engine.validate_csv_data(
-                job, source_data, target_data
-            )
+            if not job.ruleset:
+                logger.warning(f"Job {job_id} has no ruleset - cannot perform reconciliation")
+                raise ValueError("Job doesn't have a specified ruleset")
+
+            logger.debug(f"Validating and reconciling CSV data for job {job_id}")
+            validation_errors, results = self._run_reconciliation(job)
             if validation_errors:
                 logger.error(f"Job {job_id} validation failed with {len(validation_errors)} errors")
                 raise DataValidationError(
@@ -128,107 +185,153 @@ class JobProcessor:
 
             logger.debug(f"Job {job_id} data validation passed")
 
-            logger.debug(f"Starting reconciliation for job {job_id}")
-            results = self.reconciliation_engine.reconcile_data(job, source_data, target_data)
-
             logger.debug(f"Saving results for job {job_id}")
-            self._save_results(job, results)
-
-            summary = self.reconciliation_engine.summary(job, results)
-            job.result_summary = summary
-            job.save()
+            # Results and the completed status become visible together or not at all
+            with transaction.atomic():
+                self._save_results(job, results)
 
-            job.status = "completed"
-            job.save()
+                job.result_summary = self.reconciliation_engine.summary(job, results)
+                job.status = "completed"
+                job.save(update_fields=["result_summary", "status", "updated_at"])
             job.cleanup_files(logger=logger)
 
-            processing_time = (datetime.now() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             logger.info(f"Job {job_id} completed successfully in {processing_time:.2f} seconds")
 
         except ReconciliationJob.DoesNotExist:
             logger.error(f"Job {job_id} not found in database")
         except DataValidationError as e:
             logger.error(f"Job {job_id} validation failed: {e}")
-            try:
-                job = ReconciliationJob.objects.get(id=job_id)
-                job.status = "failed"
-                job.error_message = e.errors
-                job.save()
-                logger.debug(f"Job {job_id} status updated to 'failed'")
-            except Exception as save_error:
-                logger.error(f"Failed to update job {job_id} status to failed: {save_error}")
+            self._mark_failed(job_id, e)
         except Exception as e:
-            processing_time = (datetime.now() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             logger.error(f"Job {job_id} failed after {processing_time:.2f} seconds: {e}")
-            try:
-                job = ReconciliationJob.objects.get(id=job_id)
-                job.status = "failed"
-                job.error_message = [{"error": str(e)}]
-                job.save()
-                logger.debug(f"Job {job_id} status updated to 'failed'")
-            except Exception as save_error:
-                logger.error(f"Failed to update job {job_id} status to failed: {save_error}")
-
-    def _read_csv_file(self, file_path: str) -> list:
+            self._mark_failed(job_id, e)
+
+    def _mark_failed(self, job_id: int, error: Exception):
+        """Flag the job as failed with a single UPDATE, without reloading the row"""
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                return list(reader)
-        except Exception as e:
-            logger.error(f"Error reading CSV file {file_path}: {e}")
-            return []
+            ReconciliationJob.objects.filter(pk=job_id).update(
+                status="failed", error_message=exception_details(error), updated_at=timezone.now()
+            )
+            logger.debug(f"Job {job_id} status updated to 'failed'")
+        except Exception as save_error:
+            logger.error(f"Failed to update job {job_id} status to failed: {save_error}")
+
+    def _run_reconciliation(self, job: ReconciliationJob) -> Tuple[List, Optional[Dict]]:
+        """Run validation and reconciliation in the process pool when one is configured"""
+        args = (
+            job.source_file_path,
+            job.target_file_path,
+            job.ruleset.match_key,
+            self.reconciliation_engine.get_field_type_map(job),
+        )
+        if self.process_pool is not None:
+            return self.process_pool.submit(run_reconciliation, *args).result()
+        return run_reconciliation(*args)
 
     def _save_results(self, job: ReconciliationJob, results: dict):
-        """Save reconciliation results to database"""
+        """Save reconciliation results to database in batches within the caller's transaction"""
+        batch_size = getattr(settings, "RECONCILIATION_RESULT_BATCH_SIZE", 1000)
+
         # Save matched records
-        for result in results["matched"]:
-            ReconciliationResult.objects.create(
-                job=job,
-                result_type="matched",
-                source_row_data=result["source_row"],
-                target_row_data=result["target_row"],
-                match_key=result["match_key"],
-                differences=result["differences"],
-            )
+        self._bulk_create_results(
+            (
+                ReconciliationResult(
+                    job=job,
+                    result_type="matched",
+                    source_row_data=result.source_row,
+                    target_row_data=result.target_row,
+                    match_key=result.match_key,
+                    differences=result.differences,
+                )
+                for result in results["matched"]
+            ),
+            batch_size,
+        )
 
         # Save unmatched source records
-        for result in results["unmatched_source"]:
-            ReconciliationResult.objects.create(
-                job=job,
-                result_type="unmatched_source",
-                source_row_data=result["source_row"],
-                match_key=result["match_key"],
-            )
+        self._bulk_create_results(
+            (
+                ReconciliationResult(
+                    job=job,
+                    result_type="unmatched_source",
+                    source_row_data=result.row,
+                    match_key=result.match_key,
+                )
+                for result in results["unmatched_source"]
+            ),
+            batch_size,
+        )
 
         # Save unmatched target records
-        for result in results["unmatched_target"]:
-            ReconciliationResult.objects.create(
-                job=job,
-                result_type="unmatched_target",
-                target_row_data=result["target_row"],
-                match_key=result["match_key"],
-            )
+        self._bulk_create_results(
+            (
+                ReconciliationResult(
+                    job=job,
+                    result_type="unmatched_target",
+                    target_row_data=result.row,
+                    match_key=result.match_key,
+                )
+                for result in results["unmatched_target"]
+            ),
+            batch_size,
+        )
+
+    def _bulk_create_results(self, objs: Iterable[ReconciliationResult], batch_size: int):
+        """Insert results batch by batch so only one batch of instances is held in memory"""
+        copy_results = connection.vendor == "postgresql" and getattr(
+            settings, "RECONCILIATION_COPY_RESULTS", False
+        )
+        objs = iter(objs)
+        while True:
+            batch = list(islice(objs, batch_size))
+            if not batch:
+                break
+            if copy_results:
+                self._copy_results(batch)
+            else:
+                ReconciliationResult.objects.bulk_create(batch, batch_size=batch_size)
+
+    def _copy_results(self, batch: List[ReconciliationResult]):
+        """Stream a batch of results into PostgreSQL with COPY instead of parameterized INSERTs"""
+        fields = [ReconciliationResult._meta.get_field(name) for name in COPY_RESULT_FIELDS]
+        buffer = io.StringIO()
+        for obj in batch:
+            values = []
+            for field in fields:
+                value = getattr(obj, field.attname)
+                if value is None:
+                    # An unquoted empty value is NULL in COPY's CSV format
+                    values.append("")
+                    continue
+                if isinstance(field, models.JSONField):
+                    value = json.dumps(value, cls=field.encoder)
+                values.append('"' + str(value).replace('"', '""') + '"')
+            buffer.write(",".join(values))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+            connection.ops.quote_name(ReconciliationResult._meta.db_table),
+            ", ".join(connection.ops.quote_name(field.column) for field in fields),
+        )
+        with connection.cursor() as cursor:
+            if hasattr(cursor, "copy"):
+                # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+            else:
+                # psycopg2
+                cursor.copy_expert(sql, buffer)
 
 
 class JobManager:
     """Orchestrates job submission and processing"""
 
-    _instance = None
-    _lock = threading.Lock()
-
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
-
-    def __init__(self):
-        if not self._initialized:
-            self.job_queue = JobQueue()
-            self.job_processor = JobProcessor(self.job_queue)
-            self._initialized = True
+    def __init__(self, job_queue: JobQueue):
+        self.job_queue = job_queue
+        self.job_processor = JobProcessor(self.job_queue)
 
     def start_processing(self):
         """Start the background job processor"""
@@ -240,22 +343,24 @@ class JobManager:
 
     def submit_job(self, job_id: int) -> bool:
         """Submit a job for processing"""
-        success = self.job_queue.submit_job(job_id)
-        if success:
-            try:
-                job = ReconciliationJob.objects.get(id=job_id)
-                job.status = "queued"
-                job.save()
-            except ReconciliationJob.DoesNotExist:
-                logger.error(f"Job {job_id} not found when updating status to queued")
-                return False
-        return success
+        # Mark the job queued before a worker can see it, otherwise a fast worker may finish
+        # the job and have its status overwritten back to queued
+        updated = ReconciliationJob.objects.filter(pk=job_id).update(
+            status="queued", updated_at=timezone.now()
+        )
+        if not updated:
+            logger.error(f"Job {job_id} not found when updating status to queued")
+            return False
+        return self.job_queue.submit_job(job_id)
 
     def get_queue_status(self) -> dict:
         return {
             "queue_size": self.job_queue.get_queue_size(),
             "processor_running": self.job_processor.is_running,
+            "workers": self.job_processor.num_workers,
         }
 
 
-job_manager = JobManager()
+# Module import runs once under the import lock, so these are the process-wide instances
+job_queue = JobQueue()
+job_manager = JobManager(job_queue)
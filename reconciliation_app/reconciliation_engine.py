@@ -1,11 +1,21 @@
+import csv
 import logging
 import re
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from price_parser import Price
 
-from .models import ReconciliationJob
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+from .models import ReconciliationJob, RulesetField
 
 logger = logging.getLogger("reconciliation_app.reconciliation")
 
@@ -13,12 +23,27 @@ URL_PATTERN = r"^https?://[^\s/$.?#].[^\s]*$"
 EMAIL_PATTERN = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
 PHONE_PATTERN = r"^[\+]?[1-9]?[\d\s\-\(\)\.]{7,15}$"
 
-DATE_FORMATS = [
+URL_RE = re.compile(URL_PATTERN)
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+
+# Currency symbols, percent signs and spaces deleted from numbers in a single translate pass
+NUMBER_DECORATIONS = str.maketrans("", "", "$£€¥₹₽¢₩₪₨₦₡% ")
+# Unsigned decimals price_parser reads exactly as written. With three fraction digits it takes
+# the dot for a thousands separator instead, so those still go through it
+PLAIN_DECIMAL_RE = re.compile(r"([0-9]*)\.(?:[0-9]{1,2}|[0-9]{4,})")
+
+# Values fromisoformat parses exactly as the "%Y-%m-%d", "%Y-%m-%d %H:%M:%S",
+# "%Y-%m-%dT%H:%M:%S" and "%Y-%m-%d %H:%M:%S.%f" formats below would
+ISO_DATETIME_RE = re.compile(
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}"
+    r"(?: [0-9]{2}:[0-9]{2}:[0-9]{2}(?:\.[0-9]{1,6})?|T[0-9]{2}:[0-9]{2}:[0-9]{2})?"
+)
+
+DATE_FORMATS = (
     "%Y-%m-%d",
     "%Y/%m/%d",
     "%m/%d/%Y",
     "%d/%m/%Y",
-    "%d-%-m-%Y",
     "%Y%m%d",
     "%d.%m.%Y",
     "%d-%m-%Y",
@@ -26,57 +51,133 @@ DATE_FORMATS = [
     "%d-%m-%Y %H:%M:%S",
     "%Y-%m-%dT%H:%M:%S",
     "%Y-%m-%d %H:%M:%S.%f",
-]
+)
+
+# Separators date formats match literally. The directives above only ever match digits and
+# spaces, so a value can only parse with formats using exactly its own set of separators
+DATE_SEPARATORS = frozenset("/-.:")
+DATE_FORMATS_BY_SEPARATORS = {
+    separators: tuple(
+        fmt for fmt in DATE_FORMATS if DATE_SEPARATORS.intersection(fmt) == separators
+    )
+    for separators in {DATE_SEPARATORS.intersection(fmt) for fmt in DATE_FORMATS}
+}
+
+# Read buffer for CSV files parsed with the csv module
+CSV_READ_BUFFER_SIZE = 1 << 20
+
+# Bytes of CSV parsed per pyarrow record batch
+ARROW_CSV_BLOCK_SIZE = 8 << 20
 
+# Upper bound on memoized (value, field type) normalizations held at once
+NORMALIZE_CACHE_SIZE = 65536
+
+# Rulesets whose field type maps are kept in memory between jobs
+FIELD_TYPE_MAP_CACHE_SIZE = 128
+
+# Validation stops collecting errors once this many have been found
+MAX_VALIDATION_ERRORS = 100
 
 BOOLEAN_OPTIONS = ["true", "false", "1", "0", "yes", "no"]
 
+# Recognized boolean spellings, looked up after stripping and lower casing
+BOOLEAN_VALUES = {
+    "true": True,
+    "t": True,
+    "yes": True,
+    "y": True,
+    "1": True,
+    "on": True,
+    "enable": True,
+    "enabled": True,
+    "active": True,
+    "positive": True,
+    "ok": True,
+    "okay": True,
+    "correct": True,
+    "right": True,
+    "valid": True,
+    "good": True,
+    "success": True,
+    "pass": True,
+    "passed": True,
+    "approve": True,
+    "approved": True,
+    "accept": True,
+    "accepted": True,
+    "confirm": True,
+    "confirmed": True,
+    "false": False,
+    "f": False,
+    "no": False,
+    "n": False,
+    "0": False,
+    "off": False,
+    "disable": False,
+    "disabled": False,
+    "inactive": False,
+    "negative": False,
+    "wrong": False,
+    "incorrect": False,
+    "invalid": False,
+    "bad": False,
+    "fail": False,
+    "failed": False,
+    "failure": False,
+    "error": False,
+    "reject": False,
+    "rejected": False,
+    "deny": False,
+    "denied": False,
+    "cancel": False,
+    "cancelled": False,
+}
+
+
+# Mapping letters to numbers to cater for phone numbers with vanity numbers, the separators
+# allowed in phone numbers are deleted in the same pass
+VANITY_LETTERS_TO_DIGITS = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "22233344455566677778889999",
+    "-().+",
+)
+
+
+@dataclass(slots=True)
+class MatchedRecord:
+    """A source row and target row sharing a match key"""
+
+    source_row: Dict
+    target_row: Dict
+    match_key: Any
+    differences: Optional[Dict]
+
+
+@dataclass(slots=True)
+class UnmatchedRecord:
+    """A row whose match key only appears in one of the two files"""
+
+    row: Dict
+    match_key: Any
+
 
 class ReconciliationEngine:
 
     def __init__(self):
         self.logger = logger
 
-    def normalize_phone_with_letters(self, phone_number: str) -> Optional[str]:
+    @staticmethod
+    def normalize_phone_with_letters(phone_number: str) -> Optional[str]:
         """Convert vanity phone numbers to digits"""
         if not phone_number:
             return None
 
-        # Mapping letters to numbers to cater for phone numbers with vanity numbers
-        letter_to_digit = {
-            "A": "2",
-            "B": "2",
-            "C": "2",
-            "D": "3",
-            "E": "3",
-            "F": "3",
-            "G": "4",
-            "H": "4",
-            "I": "4",
-            "J": "5",
-            "K": "5",
-            "L": "5",
-            "M": "6",
-            "N": "6",
-            "O": "6",
-            "P": "7",
-            "Q": "7",
-            "R": "7",
-            "S": "7",
-            "T": "8",
-            "U": "8",
-            "V": "8",
-            "W": "9",
-            "X": "9",
-            "Y": "9",
-            "Z": "9",
-        }
-        normalized = re.sub(r"[\s\-\(\)\.\+]+", "", phone_number).upper()
-        for letter, digit in letter_to_digit.items():
-            normalized = normalized.replace(letter, digit)
+        # split() drops every kind of whitespace, translate the remaining separators and letters
+        normalized = "".join(phone_number.upper().split()).translate(VANITY_LETTERS_TO_DIGITS)
         return "".join(filter(str.isdigit, normalized))
 
-    def normalize_number_field(self, value: str, field_type: str = "float") -> float | int | str:
+    @staticmethod
+    def normalize_number_field(value: str, field_type: str = "float") -> float | int | str:
         """
         Normalize numeric fields to handle different formatting conventions and return actual numeric values.
         - Remove currency notations
@@ -98,6 +199,17 @@ class ReconciliationEngine:
         if not normalized:
             return normalized
 
+        if normalized.isascii() and normalized.isdigit():
+            # Bare digits, the most common numeric cell, convert directly
+            return int(normalized) if field_type == "integer" else float(normalized)
+
+        plain_decimal = PLAIN_DECIMAL_RE.fullmatch(normalized)
+        if plain_decimal:
+            # Same result as price_parser without its parsing and object allocation
+            if field_type == "integer":
+                return int(plain_decimal[1] or 0)
+            return float(normalized)
+
         try:
             price = Price.fromstring(normalized)
             if price.amount is not None:
@@ -109,8 +221,7 @@ class ReconciliationEngine:
             pass
 
         try:
-            fallback = re.sub(r"[$£€¥₹₽¢₩₪₨₦₡%]", "", normalized)
-            fallback = fallback.replace(" ", "")
+            fallback = normalized.translate(NUMBER_DECORATIONS)
 
             if field_type == "integer":
                 return int(float(fallback))
@@ -119,73 +230,12 @@ class ReconciliationEngine:
         except (ValueError, OverflowError):
             return normalized
 
-    def normalize_boolean(self, value: str) -> Optional[bool]:
+    @staticmethod
+    def normalize_boolean(value: str) -> Optional[bool]:
         if not value:
             return None
 
-        normalized = str(value).strip().lower()
-
-        true_values = {
-            "true",
-            "t",
-            "yes",
-            "y",
-            "1",
-            "on",
-            "enable",
-            "enabled",
-            "active",
-            "positive",
-            "ok",
-            "okay",
-            "correct",
-            "right",
-            "valid",
-            "good",
-            "success",
-            "pass",
-            "passed",
-            "approve",
-            "approved",
-            "accept",
-            "accepted",
-            "confirm",
-            "confirmed",
-        }
-
-        false_values = {
-            "false",
-            "f",
-            "no",
-            "n",
-            "0",
-            "off",
-            "disable",
-            "disabled",
-            "inactive",
-            "negative",
-            "wrong",
-            "incorrect",
-            "invalid",
-            "bad",
-            "fail",
-            "failed",
-            "failure",
-            "error",
-            "reject",
-            "rejected",
-            "deny",
-            "denied",
-            "cancel",
-            "cancelled",
-        }
-
-        if normalized in true_values:
-            return True
-        elif normalized in false_values:
-            return False
-        else:
-            return None
+        return BOOLEAN_VALUES.get(str(value).strip().lower())
 
     def normalize_string_field(self, value: str, field_type: str = "string") -> Any:
         """
@@ -202,34 +252,41 @@ class ReconciliationEngine:
         if not value or not isinstance(value, str):
             return value
 
-        # Handle numeric types with special normalization
-        if field_type in ["integer", "float"]:
-            return self.normalize_number_field(value, field_type)
-
-        normalized = value.replace("\n", " ").replace("\r", "").lower().strip()
-
-        if field_type == "email":
-            return normalized
-        elif field_type == "phone":
-            normalized = self.normalize_phone_with_letters(normalized)
-            return normalized
-        elif field_type in ["date", "datetime"]:
-            _, _, date = self.validate_datetime(value, field_type)
-            return date
-        elif field_type == "boolean":
-            return self.normalize_boolean(value)
-        else:
-            normalized = re.sub(r"\s+", " ", normalized)
-            return normalized
-
-    def validate_datetime(self, date: str | datetime, data_type: str) -> Tuple[bool, str, datetime]:
+        normalized = _normalize_cached(value, field_type)
+        if normalized != normalized:
+            # NaN is never equal to itself, but the memoized object would still match by
+            # identity when used as a dict key, so hand out a fresh one like before caching
+            return float("nan")
+        return normalized
+
+    @staticmethod
+    def _normalize_text(value: str) -> str:
+        """Lower case the value and collapse every whitespace run into a single space"""
+        if "\r" in value:
+            value = value.replace("\r", "")
+        # str.split breaks on the same characters as \s and drops leading and trailing runs
+        return " ".join(value.lower().split())
+
+    @staticmethod
+    def validate_datetime(date: str | datetime, data_type: str) -> Tuple[bool, str, datetime]:
         if isinstance(date, datetime):
             return True, "", date
+        if ISO_DATETIME_RE.fullmatch(date):
+            # The common ISO layouts parse in C instead of probing formats through strptime
+            try:
+                return True, "", datetime.fromisoformat(date)
+            except ValueError:
+                pass
+
         parsed = False
         value = None
-        for fmt in DATE_FORMATS:
+        # Formats that can't match the value's separators would only raise, skip them while
+        # keeping the remaining ones in order so ambiguous day/month values parse as before
+        formats = DATE_FORMATS_BY_SEPARATORS.get(DATE_SEPARATORS.intersection(date), ())
+        strptime = datetime.strptime
+        for fmt in formats:
             try:
-                value = datetime.strptime(date, fmt)
+                value = strptime(date, fmt)
                 parsed = True
                 break
             except ValueError:
@@ -261,28 +318,13 @@ class ReconciliationEngine:
         if not value:
             return None
 
+        validator = _VALIDATOR_FNS.get(data_type)
+        if validator is None:
+            # Free text and booleans accept any non-empty value
+            return None
+
         try:
-            if data_type == "integer":
-                int(value)
-            elif data_type == "float":
-                float(value)
-            elif data_type == "boolean":
-                if value is None:
-                    return f"Invalid boolean '{value}'"
-            elif data_type in ["date", "datetime"]:
-                parsed, error, _ = self.validate_datetime(value, data_type)
-                if not parsed:
-                    return error
-            elif data_type == "email":
-                if not re.match(EMAIL_PATTERN, value):
-                    return f"Invalid email format '{value}'"
-            elif data_type == "phone":
-                phone_number = self.normalize_phone_with_letters(value)
-                if not phone_number:
-                    return f"Invalid phone format '{value}'"
-            elif data_type == "url":
-                if not re.match(URL_PATTERN, value):
-                    return f"Invalid URL format '{value}'"
+            return validator(value)
         except ValueError as e:
             return f"Invalid {data_type} value '{value}': {str(e)}"
         except OverflowError:
@@ -290,191 +332,147 @@ class ReconciliationEngine:
 
         return None
 
-    def validate_csv_data(
-        self, job: ReconciliationJob, source_data: List[Dict], target_data: List[Dict]
-    ) -> List[Dict[str, str]]:
+    def ingest(
+        self,
+        rows: Iterable[Dict],
+        match_key: str,
+        field_type_map: Dict[str, str],
+        where: str,
+        validation_errors: List,
+    ) -> Tuple[Dict[Any, Dict], Optional[set]]:
         """
-        Validate CSV data against ruleset definitions with value normalization.
-        Limits errors to 100 to prevent too much output.
+        Validate rows against the ruleset and index them by normalized match key in a single
+        pass, so each file is read and normalized once. Duplicate keys keep the last
+        occurrence. Stops reading once MAX_VALIDATION_ERRORS errors have been collected.
 
         Args:
-            job: ReconciliationJob instance with ruleset
-            source_data: Source CSV data as list of dictionaries
-            target_data: Target CSV data as list of dictionaries
+            rows: CSV rows as an iterable of dictionaries
+            match_key: Field name used to match source and target records
+            field_type_map: Mapping of ruleset field names to data types
+            where: Which file the rows come from, 'source' or 'target'
+            validation_errors: Errors found so far, new errors are appended to it
 
         Returns:
-            List of validation error messages
+            Tuple of (normalized key to row mapping, set of row headers). Headers are None
+            when there are no rows.
         """
-        validation_errors = []
-
-        if not job.ruleset:
-            self.logger.warning(f"Job {job.id} has no ruleset - skipping data validation")
-            return validation_errors
-
-        field_type_map = {field.field_name: field.data_type for field in job.ruleset.fields.all()}
-        error_count = 0
-
-        for i, row in enumerate(source_data, 1):
-            if error_count >= 100:
-                validation_errors.append("... and more errors (showing first 100)")
+        index = {}
+        headers = None
+        has_match_key = False
+
+        for i, row in enumerate(rows, 1):
+            if len(validation_errors) >= MAX_VALIDATION_ERRORS:
+                # Rows are left unchecked, say so once whichever file hit the cap
+                if not isinstance(validation_errors[-1], str):
+                    validation_errors.append(
+                        f"... and more errors (showing first {MAX_VALIDATION_ERRORS})"
+                    )
                 break
 
-            for field_name, value in row.items():
-                if field_name in field_type_map:
-                    data_type = field_type_map[field_name]
-
-                    if value and isinstance(value, str):
-                        normalized_value = self.normalize_string_field(value, data_type)
-                    else:
-                        normalized_value = value
-
-                    error = self.validate_field_value(normalized_value, data_type)
-                    if error:
-                        d = {
-                            "row": i,
-                            "field": field_name,
-                            "error": error,
-                            "original_value": value,
-                            "normalized_value": normalized_value,
-                            "where": "source file",
-                        }
-                        validation_errors.append(d)
-                        error_count += 1
-                        if error_count >= 100:
-                            break
-
-        for i, row in enumerate(target_data, 1):
-            if error_count >= 100:
-                break
+            if headers is None:
+                headers = set(row.keys())
+                has_match_key = match_key in headers
+                # Resolve the ruleset columns once, in file order, skipping columns without a type
+                typed_fields = [
+                    (field_name, field_type_map[field_name])
+                    for field_name in row
+                    if field_name in field_type_map
+                ]
+
+            for field_name, data_type in typed_fields:
+                value = row.get(field_name)
+
+                # Normalize value before validation, empty and non-string cells come back as is
+                normalized_value = self.normalize_string_field(value, data_type)
+
+                error = self.validate_field_value(normalized_value, data_type)
+                if error:
+                    d = {
+                        "row": i,
+                        "field": field_name,
+                        "error": error,
+                        "original_value": value,
+                        "normalized_value": normalized_value,
+                        "where": f"{where} file",
+                    }
+                    validation_errors.append(d)
+                    if len(validation_errors) >= MAX_VALIDATION_ERRORS:
+                        break
 
-            for field_name, value in row.items():
-                if field_name in field_type_map:
-                    data_type = field_type_map[field_name]
-
-                    # Normalize value before validation
-                    if value and isinstance(value, str):
-                        normalized_value = self.normalize_string_field(value, data_type)
-                    else:
-                        normalized_value = value
-
-                    error = self.validate_field_value(normalized_value, data_type)
-                    if error:
-                        d = {
-                            "row": i,
-                            "field": field_name,
-                            "error": error,
-                            "original_value": value,
-                            "normalized_value": normalized_value,
-                            "where": "target file",
-                        }
-                        validation_errors.append(d)
-                        error_count += 1
-                        if error_count >= 100:
-                            break
-
-        return validation_errors
+            if has_match_key:
+                normalized_key = self.normalize_value_for_comparison(
+                    row[match_key], match_key, field_type_map
+                )
+                index[normalized_key] = row
+
+        return index, headers
 
     def get_field_type_map(self, job: ReconciliationJob) -> Dict[str, str]:
         """Get field type mapping from ruleset"""
         if not job.ruleset:
             return {}
-        return {field.field_name: field.data_type for field in job.ruleset.fields.all()}
+        return field_type_map_for_ruleset(job.ruleset_id, job.ruleset.updated_at)
 
     def normalize_value_for_comparison(
         self, value: str, field_name: str, field_type_map: Dict[str, str]
     ) -> str | datetime:
         """Normalize value based on field type"""
-        if not value or not isinstance(value, str):
-            return value
-
         field_type = field_type_map.get(field_name, "string")
         return self.normalize_string_field(value, field_type)
 
     def reconcile_data(
-        self, job: ReconciliationJob, source_data: List[Dict], target_data: List[Dict]
+        self,
+        source_index: Dict[Any, Dict],
+        target_index: Dict[Any, Dict],
+        all_fields: Iterable[str],
+        field_and_datatype_map: Dict[str, str],
     ) -> Dict[str, List]:
         """
         Perform data reconciliation between source and target datasets.
 
         Args:
-            job: ReconciliationJob instance with ruleset and match key
-            source_data: Source CSV data as list of dictionaries
-            target_data: Target CSV data as list of dictionaries
+            source_index: Source rows keyed by normalized match key, as built by ingest
+            target_index: Target rows keyed by normalized match key, consumed by the join
+            all_fields: Fields to compare, from both datasets
+            field_and_datatype_map: Mapping of ruleset field names to data types
 
         Returns:
-            Dictionary containing matched, unmatched_source, and unmatched_target records
-
-        Raises:
-            ValueError: If data is invalid or match key is missing
+            Dictionary containing lists of MatchedRecord under matched, and UnmatchedRecord
+            under unmatched_source and unmatched_target
         """
-        if not source_data or not target_data:
-            raise ValueError("Empty data sets")
-
-        if not job.ruleset:
-            self.logger.warning(f"Job {job.id} has no ruleset - cannot perform reconciliation")
-            raise ValueError("Job doesn't have a specified ruleset")
-
-        source_keys = set(source_data[0].keys()) if source_data else set()
-        target_keys = set(target_data[0].keys()) if target_data else set()
-
-        match_key = job.ruleset.match_key
-        if match_key not in source_keys:
-            raise ValueError(f"Match key '{match_key}' not found in source data")
-        if match_key not in target_keys:
-            raise ValueError(f"Match key '{match_key}' not found in target data")
-
-        self.logger.info(f"Using match key '{match_key}' for reconciliation")
-
-        field_and_datatype_map = self.get_field_type_map(job)
-
-        source_dict = {}
-        target_dict = {}
-
-        for row in source_data:
-            normalized_key = self.normalize_value_for_comparison(
-                row[match_key], match_key, field_and_datatype_map
-            )
-            source_dict[normalized_key] = row
-
-        for row in target_data:
-            normalized_key = self.normalize_value_for_comparison(
-                row[match_key], match_key, field_and_datatype_map
-            )
-            target_dict[normalized_key] = row
-
         results = {"matched": [], "unmatched_source": [], "unmatched_target": []}
 
-        all_keys = set(source_dict.keys()) | set(target_dict.keys())
-
-        for key in all_keys:
-            source_row = source_dict.get(key)
-            target_row = target_dict.get(key)
-
-            if source_row and target_row:
-                # Found in both - check for differences
-                differences = self._compare_records(
-                    source_row, target_row, source_keys.union(target_keys), field_and_datatype_map
-                )
+        # Resolve every compared field's type once instead of per matched row
+        typed_fields = tuple(
+            (field, field_and_datatype_map.get(field, "string")) for field in all_fields
+        )
+
+        # Hash join: probe the target index with every source key, popping matches so that
+        # whatever remains in the target index has no counterpart in the source
+        for key, source_row in source_index.items():
+            target_row = target_index.pop(key, None)
+
+            if target_row is not None:
+                # Found in both - identical rows are settled by a single C-level dict
+                # comparison, only rows that differ are compared field by field
+                if source_row == target_row:
+                    differences = None
+                else:
+                    differences = self._compare_records(source_row, target_row, typed_fields)
 
                 results["matched"].append(
-                    {
-                        "source_row": source_row,
-                        "target_row": target_row,
-                        "match_key": key,
-                        "differences": differences if differences else None,
-                    }
+                    MatchedRecord(source_row, target_row, key, differences if differences else None)
                 )
+            else:
+                results["unmatched_source"].append(UnmatchedRecord(source_row, key))
 
-            elif source_row and not target_row:
-                results["unmatched_source"].append({"source_row": source_row, "match_key": key})
-
-            elif target_row and not source_row:
-                results["unmatched_target"].append({"target_row": target_row, "match_key": key})
+        for key, target_row in target_index.items():
+            results["unmatched_target"].append(UnmatchedRecord(target_row, key))
 
         return results
 
     def _compare_records(
-        self, source_row: Dict, target_row: Dict, all_fields: set, field_type_map: Dict[str, str]
+        self, source_row: Dict, target_row: Dict, typed_fields: Tuple[Tuple[str, str], ...]
     ) -> Dict[str, Dict]:
         """
         Compare two records field by field and return differences.
@@ -482,24 +480,22 @@ class ReconciliationEngine:
         Args:
             source_row: Source record data
             target_row: Target record data
-            all_fields: All possible fields from both records
-            field_type_map: Mapping of field names to data types
+            typed_fields: (field name, data type) pairs for all possible fields of both records
 
         Returns:
             Dictionary of differences by field name
         """
         differences = {}
 
-        for field in all_fields:
+        for field, field_type in typed_fields:
             source_val = source_row.get(field, "")
             target_val = target_row.get(field, "")
+            if source_val == target_val:
+                # Identical raw values can't differ once normalized, skip normalizing them
+                continue
 
-            normalized_source = self.normalize_value_for_comparison(
-                source_val, field, field_type_map
-            )
-            normalized_target = self.normalize_value_for_comparison(
-                target_val, field, field_type_map
-            )
+            normalized_source = self.normalize_string_field(source_val, field_type)
+            normalized_target = self.normalize_string_field(target_val, field_type)
 
             if normalized_source != normalized_target:
                 differences[field] = {"source": source_val, "target": target_val}
@@ -517,22 +513,235 @@ class ReconciliationEngine:
         Returns:
             Dictionary containing summary statistics
         """
+        source_count = job.source_record_count
+        target_count = job.target_record_count
+        matched_count = len(results["matched"])
         return {
-            "total_source_records": job.source_record_count,
-            "total_target_records": job.target_record_count,
-            "matched_records": len(results["matched"]),
+            "total_source_records": source_count,
+            "total_target_records": target_count,
+            "matched_records": matched_count,
             "unmatched_source_records": len(results["unmatched_source"]),
             "unmatched_target_records": len(results["unmatched_target"]),
             "match_percentage": (
-                round(
-                    (
-                        len(results["matched"])
-                        / max(job.source_record_count, job.target_record_count)
-                    )
-                    * 100,
-                    2,
-                )
-                if job.source_record_count and job.target_record_count
+                round((matched_count / max(source_count, target_count)) * 100, 2)
+                if source_count and target_count
                 else 0
             ),
         }
+
+
+def _validate_integer(value: Any) -> Optional[str]:
+    if not isinstance(value, (int, float)):
+        # Normalization already parsed well-formed numbers, only raw leftovers need checking
+        int(value)
+    return None
+
+
+def _validate_float(value: Any) -> Optional[str]:
+    if not isinstance(value, (int, float)):
+        float(value)
+    return None
+
+
+def _validate_datetime(value: Any) -> Optional[str]:
+    parsed, error, _ = ReconciliationEngine.validate_datetime(value, "datetime")
+    return None if parsed else error
+
+
+def _validate_email(value: Any) -> Optional[str]:
+    return None if EMAIL_RE.match(value) else f"Invalid email format '{value}'"
+
+
+def _validate_phone(value: Any) -> Optional[str]:
+    if ReconciliationEngine.normalize_phone_with_letters(value):
+        return None
+    return f"Invalid phone format '{value}'"
+
+
+def _validate_url(value: Any) -> Optional[str]:
+    return None if URL_RE.match(value) else f"Invalid URL format '{value}'"
+
+
+# Per data type check applied to a stripped, non-empty normalized value. Raising ValueError or
+# OverflowError is reported by validate_field_value
+_VALIDATOR_FNS = {
+    "integer": _validate_integer,
+    "float": _validate_float,
+    "date": _validate_datetime,
+    "datetime": _validate_datetime,
+    "email": _validate_email,
+    "phone": _validate_phone,
+    "url": _validate_url,
+}
+
+
+@lru_cache(maxsize=FIELD_TYPE_MAP_CACHE_SIZE)
+def field_type_map_for_ruleset(ruleset_id, ruleset_updated_at: datetime) -> Dict[str, str]:
+    """
+    Field name to data type mapping of a ruleset, shared by every job using it. Keyed on the
+    ruleset's updated_at as well so a change saved by another process is picked up, the
+    signals module clears the cache when fields change in this one. Callers must not mutate
+    the returned dict.
+    """
+    return dict(
+        RulesetField.objects.filter(ruleset_id=ruleset_id).values_list("field_name", "data_type")
+    )
+
+
+def _normalize_integer(value: str) -> Any:
+    return ReconciliationEngine.normalize_number_field(value, "integer")
+
+
+def _normalize_float(value: str) -> Any:
+    return ReconciliationEngine.normalize_number_field(value, "float")
+
+
+def _normalize_datetime(value: str) -> Optional[datetime]:
+    _, _, date = ReconciliationEngine.validate_datetime(value, "datetime")
+    return date
+
+
+def _normalize_email(value: str) -> str:
+    return value.replace("\n", " ").replace("\r", "").lower().strip()
+
+
+def _normalize_phone(value: str) -> Optional[str]:
+    normalized = value.replace("\n", " ").replace("\r", "").lower().strip()
+    return ReconciliationEngine.normalize_phone_with_letters(normalized)
+
+
+# Per data type normalization of a non-empty string, resolved with one lookup instead of a
+# chain of comparisons. Unknown types are treated as free text
+_NORMALIZER_FNS = {
+    "string": ReconciliationEngine._normalize_text,
+    "integer": _normalize_integer,
+    "float": _normalize_float,
+    "date": _normalize_datetime,
+    "datetime": _normalize_datetime,
+    "boolean": ReconciliationEngine.normalize_boolean,
+    "email": _normalize_email,
+    "phone": _normalize_phone,
+}
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_cached(value: str, field_type: str) -> Any:
+    """
+    Normalize a non-empty string for its field type. Memoized because CSV columns repeat
+    the same values (statuses, currencies, country codes) across many rows.
+    """
+    return _NORMALIZER_FNS.get(field_type, ReconciliationEngine._normalize_text)(value)
+
+
+def iter_csv_file(file_path: str) -> Iterator[Dict[str, str]]:
+    """Lazily yield CSV rows so a file is never held in memory as a full list"""
+    logger.debug(f"Reading CSV file {file_path}")
+    rows_read = 0
+    if pa_csv is not None:
+        try:
+            for row in _iter_csv_file_arrow(file_path):
+                yield row
+                rows_read += 1
+            return
+        except pa.ArrowInvalid as e:
+            # Ragged rows are rejected by pyarrow but tolerated by DictReader,
+            # finish the file with the stdlib reader from where arrow stopped
+            logger.warning(f"pyarrow could not parse {file_path}, falling back to csv: {e}")
+
+    # newline="" is what the csv module expects, it handles line endings itself
+    with open(file_path, "r", encoding="utf-8", newline="", buffering=CSV_READ_BUFFER_SIZE) as file:
+        yield from islice(_iter_dict_rows(csv.reader(file)), rows_read, None)
+
+
+def _iter_dict_rows(reader: Iterator[List[str]]) -> Iterator[Dict[str, str]]:
+    """
+    Build row dictionaries the way csv.DictReader does, zipping well-formed rows directly
+    against the header instead of going through DictReader's per-row bookkeeping.
+    """
+    headers = next(reader, None)
+    if headers is None:
+        return
+
+    width = len(headers)
+    for row in reader:
+        if len(row) == width:
+            yield dict(zip(headers, row))
+        elif row:
+            # Ragged row: pad missing cells with None and keep extras under the None key
+            row_dict = dict(zip(headers, row))
+            if len(row) > width:
+                row_dict[None] = row[width:]
+            else:
+                for name in headers[len(row) :]:
+                    row_dict[name] = None
+            yield row_dict
+
+
+def _iter_csv_file_arrow(file_path: str) -> Iterator[Dict[str, str]]:
+    """Parse the CSV with pyarrow's multithreaded C++ reader, one record batch at a time"""
+    with open(file_path, "r", encoding="utf-8", newline="") as file:
+        headers = next(csv.reader(file), None)
+    if not headers:
+        return
+
+    reader = pa_csv.open_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(
+            column_names=headers, skip_rows=1, block_size=ARROW_CSV_BLOCK_SIZE
+        ),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        # Keep every cell as the raw string, type handling is driven by the ruleset
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in headers},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    for batch in reader:
+        yield from batch.to_pylist()
+
+
+def run_reconciliation(
+    source_path: str, target_path: str, match_key: str, field_type_map: Dict[str, str]
+) -> Tuple[List[Dict[str, str]], Optional[Dict[str, List]]]:
+    """
+    Validate and reconcile two CSV files on disk.
+
+    Only plain data goes in and out, so this can run in a worker process: the process reads
+    the files itself instead of having the rows pickled across.
+
+    Returns:
+        Tuple of (validation errors, reconciliation results). Results are None when
+        validation fails.
+    """
+    engine = ReconciliationEngine()
+    try:
+        validation_errors = []
+        source_index, source_headers = engine.ingest(
+            iter_csv_file(source_path), match_key, field_type_map, "source", validation_errors
+        )
+        target_index, target_headers = engine.ingest(
+            iter_csv_file(target_path), match_key, field_type_map, "target", validation_errors
+        )
+        if validation_errors:
+            return validation_errors, None
+
+        if source_headers is None or target_headers is None:
+            raise ValueError("Empty data sets")
+        if match_key not in source_headers:
+            raise ValueError(f"Match key '{match_key}' not found in source data")
+        if match_key not in target_headers:
+            raise ValueError(f"Match key '{match_key}' not found in target data")
+
+        logger.info(f"Using match key '{match_key}' for reconciliation")
+
+        # Matched rows share the normalized match key by construction of the join, so the key
+        # column is left out of the field comparison
+        compared_fields = tuple(
+            field for field in source_headers | target_headers if field != match_key
+        )
+        results = engine.reconcile_data(source_index, target_index, compared_fields, field_type_map)
+        return validation_errors, results
+    finally:
+        # Values rarely repeat across jobs, release the memo instead of letting it grow stale
+        _normalize_cached.cache_clear()
@@ -1,13 +1,145 @@
 import csv
 import io
 import logging
+import re
+from typing import List, Optional, Tuple
 
+from django.db import transaction
 from rest_framework import serializers
 
 from .models import ReconciliationJob, ReconciliationResult, Ruleset, RulesetField
 
 logger = logging.getLogger("reconciliation_app.api")
 
+# Bytes of an uploaded CSV written and scanned at a time when saving it
+CSV_SCAN_CHUNK_SIZE = 1 << 20
+
+# Lines csv.DictReader skips as blank
+BLANK_LINE_RE = re.compile(rb"^\r?\n", re.MULTILINE)
+
+# Data types a ruleset field may declare
+DATA_TYPES = frozenset(data_type for data_type, _ in RulesetField.DATA_TYPE_CHOICES)
+
+# Ruleset fields inserted per query when a ruleset's fields are (re)created
+RULESET_FIELD_BATCH_SIZE = 500
+
+
+def is_csv_file(uploaded_file) -> bool:
+    # Extensions from some clients are upper case, e.g. REPORT.CSV
+    return uploaded_file.name.lower().endswith(".csv")
+
+
+class CsvScan:
+    """
+    Reads the header row and counts the data rows of a CSV from the chunks it is written to
+    disk with, so an upload is only read once. Blank lines are not counted, the same as
+    csv.DictReader.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header_line = None
+        self.count = 0
+        # Bytes of the file before the tail, all of them in complete and counted lines
+        self.offset = 0
+        self.tail = b""
+        # Where csv has to take over counting, once a chunk isn't plain
+        self.fallback_offset = None
+
+    def feed(self, chunk: bytes):
+        if self.fallback_offset is not None:
+            return
+        data = self.tail + chunk
+        if self.header_line is None:
+            end = data.find(b"\n") + 1
+            if not end:
+                self.tail = data
+                return
+            self.header_line, data = data[:end], data[end:]
+            self.offset = end
+            if b'"' in self.header_line:
+                # Quoted headers may span several lines, leave the whole file to csv
+                self.fallback_offset = 0
+                return
+        end = data.rfind(b"\n") + 1
+        lines, self.tail = data[:end], data[end:]
+        if not _is_plain_csv(lines):
+            # Quoted values may hold newlines, count the rest of the file with csv
+            self.fallback_offset = self.offset
+            return
+        self.count += _count_plain_csv_rows(lines)
+        self.offset += end
+
+    def result(self) -> Tuple[Optional[List[str]], int]:
+        """The header row and data row count, once every chunk of the file has been fed"""
+        if self.header_line is None:
+            # No newline at all, the header is the whole file
+            self.header_line, self.tail = self.tail, b""
+            if not self.header_line:
+                return None, 0
+            if b'"' in self.header_line:
+                self.fallback_offset = 0
+        if self.fallback_offset is None and self.tail:
+            # Last row without a trailing newline
+            if _is_plain_csv(self.tail):
+                self.count += 1
+            else:
+                self.fallback_offset = self.offset
+
+        if self.fallback_offset == 0:
+            with open(self.path, "rb") as file:
+                return _scan_csv_text(file)
+        headers = next(csv.reader([self.header_line.decode("utf-8")]))
+        if self.fallback_offset is not None:
+            with open(self.path, "rb") as file:
+                file.seek(self.fallback_offset)
+                return headers, self.count + _count_csv_rows(file)
+        return headers, self.count
+
+
+def _is_plain_csv(lines: bytes) -> bool:
+    """
+    Whether csv would read these complete lines as exactly one row per line: no quotes that
+    could carry newlines, no bare carriage returns or NULs it would reject, and valid UTF-8.
+    """
+    if b'"' in lines or b"\0" in lines:
+        return False
+    if b"\r" in lines and lines.count(b"\r") != lines.count(b"\r\n"):
+        return False
+    if not lines.isascii():
+        try:
+            lines.decode("utf-8")
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def _count_plain_csv_rows(lines: bytes) -> int:
+    rows = lines.count(b"\n")
+    if lines.startswith((b"\n", b"\r\n")) or b"\n\n" in lines or b"\n\r\n" in lines:
+        rows -= len(BLANK_LINE_RE.findall(lines))
+    return rows
+
+
+def _count_csv_rows(file) -> int:
+    # Lines only break on \n like the StringIO this streams in place of, csv handles \r\n
+    stream = io.TextIOWrapper(file, encoding="utf-8", newline="\n")
+    try:
+        return sum(1 for row in csv.reader(stream) if row)
+    finally:
+        # Detach so closing the wrapper doesn't close the file
+        stream.detach()
+
+
+def _scan_csv_text(file) -> Tuple[Optional[List[str]], int]:
+    stream = io.TextIOWrapper(file, encoding="utf-8", newline="\n")
+    try:
+        reader = csv.reader(stream)
+        headers = next(reader, None)
+        return headers, sum(1 for row in reader if row)
+    finally:
+        stream.detach()
+
 
 class ReconciliationJobSerializer(serializers.ModelSerializer):
     source_file = serializers.FileField()
@@ -40,71 +172,68 @@ class ReconciliationJobSerializer(serializers.ModelSerializer):
         ]
 
     def validate_source_file(self, value):
-        if not value.name.endswith(".csv"):
+        if not is_csv_file(value):
             raise serializers.ValidationError("Source file must be a CSV file")
         return value
 
     def validate_target_file(self, value):
-        if not value.name.endswith(".csv"):
+        if not is_csv_file(value):
             raise serializers.ValidationError("Target file must be a CSV file")
         return value
 
     def validate_ruleset_id(self, value):
-        try:
-            Ruleset.objects.get(id=value)
-            return value
-        except Ruleset.DoesNotExist:
+        if not Ruleset.objects.filter(id=value).exists():
             raise serializers.ValidationError("Ruleset not found")
+        return value
 
     @classmethod
-    def validate_and_count_csv_files(cls, source_file, target_file, ruleset):
-        logger.info(f"Starting CSV validation for ruleset: {ruleset.name}")
+    def validate_and_count_csv_files(cls, source_scan, target_scan, ruleset):
+        logger.info("Starting CSV validation for ruleset: %s", ruleset.name)
 
         try:
-            logger.debug(f"Reading source file: {source_file.name}")
-            source_content = source_file.read().decode("utf-8")
-            source_file.seek(0)
-            source_reader = csv.DictReader(io.StringIO(source_content))
-            source_data = list(source_reader)
-
-            logger.debug(f"Reading target file: {target_file.name}")
-            target_content = target_file.read().decode("utf-8")
-            target_file.seek(0)
-            target_reader = csv.DictReader(io.StringIO(target_content))
-            target_data = list(target_reader)
-
-            if not source_data:
+            logger.debug("Reading source file: %s", source_scan.path)
+            source_header_row, source_count = source_scan.result()
+
+            logger.debug("Reading target file: %s", target_scan.path)
+            target_header_row, target_count = target_scan.result()
+
+            if not source_count:
                 logger.error("Source file is empty or invalid")
                 raise ValueError("Source file is empty or invalid")
-            if not target_data:
+            if not target_count:
                 logger.error("Target file is empty or invalid")
                 raise ValueError("Target file is empty or invalid")
 
-            source_headers = set(source_data[0].keys()) if source_data else set()
-            target_headers = set(target_data[0].keys()) if target_data else set()
+            source_headers = set(source_header_row)
+            target_headers = set(target_header_row)
 
-            logger.debug(f"Source headers: {sorted(source_headers)}")
-            logger.debug(f"Target headers: {sorted(target_headers)}")
+            # Only sort the header sets when the lines will actually be emitted
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Source headers: %s", sorted(source_headers))
+                logger.debug("Target headers: %s", sorted(target_headers))
 
             if not source_headers or not target_headers:
                 logger.error("CSV files must have headers")
                 raise ValueError("CSV files must have headers")
 
-            expected_fields = set(field.field_name for field in ruleset.fields.all())
-            required_fields = set(
-                field.field_name for field in ruleset.fields.filter(is_required=True)
-            )
+            # Both sets come from one query for just the two columns they need
+            ruleset_fields = list(ruleset.fields.values_list("field_name", "is_required"))
+            expected_fields = {field_name for field_name, _ in ruleset_fields}
+            required_fields = {
+                field_name for field_name, is_required in ruleset_fields if is_required
+            }
 
-            logger.debug(f"Ruleset expected fields: {sorted(expected_fields)}")
-            logger.debug(f"Ruleset required fields: {sorted(required_fields)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Ruleset expected fields: %s", sorted(expected_fields))
+                logger.debug("Ruleset required fields: %s", sorted(required_fields))
 
             if ruleset.match_key not in source_headers:
-                logger.error(f"Match key '{ruleset.match_key}' not found in source file headers")
+                logger.error("Match key '%s' not found in source file headers", ruleset.match_key)
                 raise ValueError(
                     f"Match key '{ruleset.match_key}' not found in source file headers"
                 )
             if ruleset.match_key not in target_headers:
-                logger.error(f"Match key '{ruleset.match_key}' not found in target file headers")
+                logger.error("Match key '%s' not found in target file headers", ruleset.match_key)
                 raise ValueError(
                     f"Match key '{ruleset.match_key}' not found in target file headers"
                 )
@@ -154,19 +283,21 @@ class ReconciliationJobSerializer(serializers.ModelSerializer):
             }
 
             logger.info(
-                f"CSV validation successful - Source: {len(source_data)} records, "
-                f"Target: {len(target_data)} records, Warnings: {len(warnings)}"
+                "CSV validation successful - Source: %d records, Target: %d records, Warnings: %d",
+                source_count,
+                target_count,
+                len(warnings),
             )
 
             return {
-                "source_count": len(source_data),
-                "target_count": len(target_data),
+                "source_count": source_count,
+                "target_count": target_count,
                 "validation": validation_result,
                 "success": True,
             }
 
         except Exception as e:
-            logger.error(f"CSV validation failed: {e}")
+            logger.error("CSV validation failed: %s", e)
             return {"success": False, "error": str(e)}
 
 
@@ -233,22 +364,18 @@ class RulesetSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         fields_data = validated_data.pop("fields")
-        ruleset = Ruleset.objects.create(**validated_data)
 
+        # Reject bad fields before anything is written, not after the ruleset already exists
         for field_data in fields_data:
-            if field_data.get("data_type") not in [
-                "string",
-                "integer",
-                "float",
-                "boolean",
-                "date",
-                "datetime",
-                "email",
-                "url",
-                "phone",
-            ]:
+            if field_data.get("data_type") not in DATA_TYPES:
                 raise serializers.ValidationError(f"Invalid data type: {field_data['data_type']}")
-            RulesetField.objects.create(ruleset=ruleset, **field_data)
+
+        with transaction.atomic():
+            ruleset = Ruleset.objects.create(**validated_data)
+            RulesetField.objects.bulk_create(
+                [RulesetField(ruleset=ruleset, **field_data) for field_data in fields_data],
+                batch_size=RULESET_FIELD_BATCH_SIZE,
+            )
 
         return ruleset
 
@@ -257,12 +384,16 @@ class RulesetSerializer(serializers.ModelSerializer):
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
 
-        if fields_data is not None:
-            instance.fields.all().delete()
-            for field_data in fields_data:
-                RulesetField.objects.create(ruleset=instance, **field_data)
+        with transaction.atomic():
+            instance.save()
+
+            if fields_data is not None:
+                instance.fields.all().delete()
+                RulesetField.objects.bulk_create(
+                    [RulesetField(ruleset=instance, **field_data) for field_data in fields_data],
+                    batch_size=RULESET_FIELD_BATCH_SIZE,
+                )
 
         return instance
 
@@ -284,4 +415,5 @@ class RulesetListSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
     def get_fields_count(self, obj):
-        return obj.fields.count()
+        # Annotated by RulesetViewSet.get_queryset, rather than a COUNT query per ruleset
+        return obj.fields_count
@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Ruleset, RulesetField
+from .reconciliation_engine import field_type_map_for_ruleset
+
+
+@receiver([post_save, post_delete], sender=Ruleset)
+@receiver([post_save, post_delete], sender=RulesetField)
+def clear_field_type_map_cache(sender, **kwargs):
+    # Wait for the commit so a worker can't re-cache the fields as they were before it
+    transaction.on_commit(field_type_map_for_ruleset.cache_clear)
@@ -1,3 +1,787 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import pathlib
+import shutil
+import tempfile
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from price_parser import Price
+from rest_framework.test import APIClient
+
+from .models import (
+    CompactJSONEncoder,
+    ReconciliationJob,
+    ReconciliationResult,
+    Ruleset,
+    RulesetField,
+)
+from .queue_manager import JobProcessor, JobQueue
+from .reconciliation_engine import (
+    DATE_FORMATS,
+    DATE_FORMATS_BY_SEPARATORS,
+    MAX_VALIDATION_ERRORS,
+    MatchedRecord,
+    ReconciliationEngine,
+    UnmatchedRecord,
+    field_type_map_for_ruleset,
+    run_reconciliation,
+)
+from .serializers import CsvScan, ReconciliationJobSerializer, RulesetSerializer
+from .views import save_csv_files_to_job_directory
+
+UNQUOTED = b"id,name,amount\n1,Alice,10\n2,Bob,20\n3,Carol,30\n"
+CRLF = b"id,name,amount\r\n1,Alice,10\r\n2,Bob,20\r\n"
+NO_TRAILING_NEWLINE = b"id,name,amount\n1,Alice,10\n2,Bob,20"
+BLANK_LINES = b"id,name,amount\n\n1,Alice,10\n\r\n\n2,Bob,20\n\n"
+QUOTED_MULTILINE = (
+    b'id,name,amount\n1,"Alice\nSmith",10\n2,"Bob, Jr.",20\n3,"said ""hi""\r\nthere",30\n'
+)
+QUOTED_HEADER = b'"id","full\nname",amount\n1,Alice,10\n2,Bob,20\n'
+NON_ASCII = "\ufeffid,name,amount\n1,Zoë,10\n2,Łukasz,20\n".encode("utf-8")
+INVALID_UTF8 = b"id,name,amount\n1,Alice,10\n2,B\xffb,20\n"
+
+
+def dictreader_scan(data: bytes):
+    """Headers and row count the way validation read uploads before it streamed them"""
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8")))
+    rows = list(reader)
+    return reader.fieldnames, len(rows)
+
+
+def scan_in_chunks(data: bytes, chunk_size: int):
+    with tempfile.NamedTemporaryFile(delete=False) as file:
+        file.write(data)
+    try:
+        scan = CsvScan(file.name)
+        for start in range(0, len(data), chunk_size):
+            scan.feed(data[start : start + chunk_size])
+        return scan.result()
+    finally:
+        pathlib.Path(file.name).unlink()
+
+
+class CsvScanTests(TestCase):
+    # Chunk sizes that split headers, rows, quotes and \r\n pairs at every kind of boundary
+    CHUNK_SIZES = (1, 2, 3, 7, 16, 1 << 20)
+
+    def assert_matches_dictreader(self, data: bytes):
+        expected = dictreader_scan(data)
+        for chunk_size in self.CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(scan_in_chunks(data, chunk_size), expected)
+
+    def test_unquoted(self):
+        self.assert_matches_dictreader(UNQUOTED)
+        self.assertEqual(scan_in_chunks(UNQUOTED, 4), (["id", "name", "amount"], 3))
+
+    def test_crlf(self):
+        self.assert_matches_dictreader(CRLF)
+
+    def test_no_trailing_newline(self):
+        self.assert_matches_dictreader(NO_TRAILING_NEWLINE)
+
+    def test_blank_lines_are_not_counted(self):
+        self.assert_matches_dictreader(BLANK_LINES)
+        self.assertEqual(scan_in_chunks(BLANK_LINES, 5)[1], 2)
+
+    def test_quoted_multiline(self):
+        self.assert_matches_dictreader(QUOTED_MULTILINE)
+        self.assertEqual(scan_in_chunks(QUOTED_MULTILINE, 6)[1], 3)
+
+    def test_quoted_header(self):
+        self.assert_matches_dictreader(QUOTED_HEADER)
+
+    def test_non_ascii(self):
+        self.assert_matches_dictreader(NON_ASCII)
+
+    def test_header_only(self):
+        self.assert_matches_dictreader(b"id,name,amount\n")
+        self.assert_matches_dictreader(b"id,name,amount")
+
+    def test_empty(self):
+        self.assertEqual(scan_in_chunks(b"", 4), (None, 0))
+
+    def test_invalid_utf8(self):
+        with self.assertRaises(UnicodeDecodeError) as expected:
+            dictreader_scan(INVALID_UTF8)
+        for chunk_size in self.CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                with self.assertRaises(UnicodeDecodeError) as raised:
+                    scan_in_chunks(INVALID_UTF8, chunk_size)
+                self.assertEqual(raised.exception.object[raised.exception.start], 0xFF)
+                self.assertEqual(raised.exception.reason, expected.exception.reason)
+
+
+class ValidateAndCountCsvFilesTests(TestCase):
+    def setUp(self):
+        self.ruleset = Ruleset.objects.create(name="Payments", match_key="id")
+        RulesetField.objects.create(ruleset=self.ruleset, field_name="id", is_required=True)
+        RulesetField.objects.create(ruleset=self.ruleset, field_name="name", is_required=True)
+        RulesetField.objects.create(ruleset=self.ruleset, field_name="amount", is_required=False)
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def validate(self, source: bytes, target: bytes, temporary: bool = False):
+        job = SimpleNamespace(
+            job_directory=self.directory,
+            source_file_path_abs=self.directory / "source.csv",
+            target_file_path_abs=self.directory / "target.csv",
+        )
+        scans = save_csv_files_to_job_directory(
+            job,
+            self.upload(source, "source.csv", temporary),
+            self.upload(target, "t.csv", temporary),
+        )
+        self.assertEqual(job.source_file_path_abs.read_bytes(), source)
+        self.assertEqual(job.target_file_path_abs.read_bytes(), target)
+        return ReconciliationJobSerializer.validate_and_count_csv_files(*scans, self.ruleset)
+
+    def upload(self, data: bytes, name: str, temporary: bool):
+        if not temporary:
+            return SimpleUploadedFile(name, data)
+        upload = TemporaryUploadedFile(name, "text/csv", len(data), None)
+        self.addCleanup(upload.close)
+        upload.write(data)
+        upload.seek(0)
+        return upload
+
+    def test_counts_match_dictreader(self):
+        for data in (UNQUOTED, CRLF, NO_TRAILING_NEWLINE, BLANK_LINES, QUOTED_MULTILINE):
+            for temporary in (False, True):
+                with self.subTest(data=data, temporary=temporary):
+                    result = self.validate(data, UNQUOTED, temporary)
+                    self.assertTrue(result["success"], result)
+                    self.assertEqual(result["source_count"], dictreader_scan(data)[1])
+                    self.assertEqual(result["target_count"], 3)
+
+    def test_empty_file(self):
+        result = self.validate(UNQUOTED, b"")
+        self.assertEqual(result, {"success": False, "error": "Target file is empty or invalid"})
+        result = self.validate(b"id,name,amount\n", UNQUOTED)
+        self.assertEqual(result, {"success": False, "error": "Source file is empty or invalid"})
+
+    def test_missing_match_key(self):
+        result = self.validate(UNQUOTED.replace(b"id,", b"key,", 1), UNQUOTED)
+        self.assertEqual(
+            result,
+            {"success": False, "error": "Match key 'id' not found in source file headers"},
+        )
+
+    def test_missing_required_field(self):
+        result = self.validate(UNQUOTED, UNQUOTED.replace(b",name,", b",label,", 1))
+        self.assertEqual(
+            result, {"success": False, "error": "Target file missing required fields: name"}
+        )
+
+    def test_unexpected_fields_warn(self):
+        result = self.validate(UNQUOTED.replace(b",amount", b",amount,note", 1), UNQUOTED)
+        self.assertTrue(result["success"])
+        self.assertEqual(
+            result["validation"]["warnings"], ["Source file has unexpected fields: note"]
+        )
+
+    def test_invalid_utf8(self):
+        result = self.validate(UNQUOTED, INVALID_UTF8)
+        self.assertFalse(result["success"])
+        self.assertTrue(
+            result["error"].startswith("'utf-8' codec can't decode byte 0xff"), result["error"]
+        )
+
+
+class ReconcileCSVFilesViewTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.jobs_directory = pathlib.Path(media_root, "reconciliation", "jobs")
+
+        self.ruleset = Ruleset.objects.create(name="Payments", match_key="id")
+        RulesetField.objects.create(ruleset=self.ruleset, field_name="id", is_required=True)
+        RulesetField.objects.create(ruleset=self.ruleset, field_name="name", is_required=True)
+        self.client = APIClient()
+
+    def post(self, source: bytes, target: bytes):
+        return self.client.post(
+            "/api/v1/reconcile/",
+            {
+                "source_file": SimpleUploadedFile("source.csv", source),
+                "target_file": SimpleUploadedFile("target.csv", target),
+                "ruleset_id": str(self.ruleset.id),
+            },
+            format="multipart",
+        )
+
+    def job_directories(self):
+        if not self.jobs_directory.exists():
+            return []
+        return list(self.jobs_directory.iterdir())
+
+    def test_valid_upload_creates_job_and_saves_files(self):
+        response = self.post(QUOTED_MULTILINE, UNQUOTED)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()["source_record_count"], 3)
+        self.assertEqual(response.json()["target_record_count"], 3)
+
+        job = ReconciliationJob.objects.get()
+        self.assertEqual(str(job.id), response.json()["job_id"])
+        self.assertEqual(pathlib.Path(job.source_file_path).read_bytes(), QUOTED_MULTILINE)
+        self.assertEqual(pathlib.Path(job.target_file_path).read_bytes(), UNQUOTED)
+
+    def test_failed_validation_leaves_no_job(self):
+        cases = {
+            "missing match key": UNQUOTED.replace(b"id,", b"key,", 1),
+            "empty": b"",
+            "invalid utf-8": INVALID_UTF8,
+        }
+        for name, source in cases.items():
+            with self.subTest(name):
+                response = self.post(source, UNQUOTED)
+                self.assertEqual(response.status_code, 400, response.content)
+                self.assertFalse(ReconciliationJob.objects.exists())
+                self.assertEqual(self.job_directories(), [])
+
+    def test_missing_match_key_error(self):
+        response = self.post(UNQUOTED, UNQUOTED.replace(b"id,", b"key,", 1))
+        self.assertEqual(
+            response.json(), {"error": "Match key 'id' not found in target file headers"}
+        )
+
+
+class FakeCopy:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def write(self, data):
+        self.cursor.payloads[-1] += data
+
+
+class FakeCursor:
+    """Records the COPY statements and data a cursor is given instead of running them"""
+
+    def __init__(self):
+        self.statements = []
+        self.payloads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class Psycopg3Cursor(FakeCursor):
+    def copy(self, sql):
+        self.statements.append(sql)
+        self.payloads.append("")
+        return FakeCopy(self)
+
+
+class Psycopg2Cursor(FakeCursor):
+    def copy_expert(self, sql, file):
+        self.statements.append(sql)
+        self.payloads.append(file.read())
+
+
+@override_settings(RECONCILIATION_COPY_RESULTS=True, RECONCILIATION_RESULT_BATCH_SIZE=1000)
+class CopyResultsTests(TestCase):
+    ROW = {"id": "1", "name": 'Say "hi", then\nleave', "amount": None}
+
+    def setUp(self):
+        self.job = ReconciliationJob.objects.create(status="processing")
+        self.processor = JobProcessor(JobQueue(), num_workers=1)
+        self.results = {
+            "matched": [
+                MatchedRecord(self.ROW, {"id": "1", "name": ""}, 'a "b",\nc', {"name": ["x", ""]})
+            ],
+            "unmatched_source": [UnmatchedRecord({"id": "2"}, "")],
+            "unmatched_target": [UnmatchedRecord({"id": "3"}, None)],
+        }
+
+    def copy(self, cursor):
+        with (
+            mock.patch.object(connection, "vendor", "postgresql"),
+            mock.patch.object(connection, "cursor", return_value=cursor),
+        ):
+            self.processor._save_results(self.job, self.results)
+        return "".join(cursor.payloads)
+
+    def test_statement(self):
+        cursor = Psycopg3Cursor()
+        self.copy(cursor)
+        self.assertEqual(
+            cursor.statements,
+            [
+                'COPY "reconciliation_app_reconciliationresult" ("job_id", "result_type", '
+                '"source_row_data", "target_row_data", "match_key", "differences") '
+                "FROM STDIN WITH (FORMAT csv)"
+            ]
+            * 3,
+        )
+
+    def test_psycopg2_and_psycopg3_send_the_same_data(self):
+        self.assertEqual(self.copy(Psycopg2Cursor()), self.copy(Psycopg3Cursor()))
+
+    def test_null_and_empty_string(self):
+        lines = self.copy(Psycopg3Cursor()).splitlines()
+        # None is an unquoted empty field, "" a quoted one
+        self.assertEqual(lines[-2], f'"{self.job.id}","unmatched_source","{{""id"":""2""}}",,"",')
+        self.assertEqual(lines[-1], f'"{self.job.id}","unmatched_target",,"{{""id"":""3""}}",,')
+
+    def test_quotes_commas_and_newlines(self):
+        payload = self.copy(Psycopg3Cursor())
+        self.assertIn(',"a ""b"",\nc",', payload)
+        self.assertIn('""name"":""Say \\""hi\\"", then\\nleave""', payload)
+        rows = list(csv.reader(io.StringIO(payload)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][:2], [str(self.job.id), "matched"])
+        self.assertEqual(rows[0][4], 'a "b",\nc')
+
+    def test_json_matches_compact_encoder(self):
+        rows = list(csv.reader(io.StringIO(self.copy(Psycopg3Cursor()))))
+        matched = self.results["matched"][0]
+        self.assertEqual(rows[0][2], json.dumps(matched.source_row, cls=CompactJSONEncoder))
+        self.assertEqual(rows[0][3], json.dumps(matched.target_row, cls=CompactJSONEncoder))
+        self.assertEqual(rows[0][5], json.dumps(matched.differences, cls=CompactJSONEncoder))
+        self.assertEqual(json.loads(rows[0][2]), self.ROW)
+        self.assertNotIn(", ", rows[0][5])
+
+    @override_settings(RECONCILIATION_COPY_RESULTS=False)
+    def test_opt_in(self):
+        cursor = Psycopg3Cursor()
+        with mock.patch.object(ReconciliationResult.objects, "bulk_create") as bulk_create:
+            self.copy(cursor)
+        self.assertEqual(cursor.statements, [])
+        self.assertEqual(bulk_create.call_count, 3)
+
+    def test_other_databases_use_bulk_create(self):
+        self.processor._save_results(self.job, self.results)
+        self.assertEqual(
+            list(self.job.results.order_by("id").values_list("result_type", "match_key")),
+            [("matched", 'a "b",\nc'), ("unmatched_source", ""), ("unmatched_target", None)],
+        )
+
+
+class DrainingJobQueue(JobQueue):
+    """Stops the processor's worker loop once the queue is empty instead of waiting for jobs"""
+
+    def __init__(self, job_ids):
+        super().__init__()
+        self.processor = None
+        for job_id in job_ids:
+            self.submit_job(job_id)
+
+    def get_batch(self, max_items, timeout=None):
+        batch = super().get_batch(max_items, timeout=0)
+        if not batch:
+            self.processor.is_running = False
+        return batch
+
+
+@override_settings(RECONCILIATION_QUEUE_BATCH_SIZE=3)
+class WorkerLoopTests(SimpleTestCase):
+    def run_worker(self, **patches):
+        job_queue = DrainingJobQueue([1, 2, 3])
+        processor = JobProcessor(job_queue, num_workers=1)
+        job_queue.processor = processor
+        processor.is_running = True
+        with (
+            mock.patch.object(processor, "_process_job") as process_job,
+            mock.patch("reconciliation_app.queue_manager.connection"),
+            mock.patch("reconciliation_app.queue_manager.time.sleep"),
+            mock.patch.multiple("reconciliation_app.queue_manager", **patches),
+        ):
+            processor._worker_loop()
+        self.assertEqual(job_queue.get_queue_size(), 0)
+        return [call.args[0] for call in process_job.call_args_list]
+
+    def test_failed_connection_check_requeues_the_batch(self):
+        close_old_connections = mock.Mock(side_effect=[OSError("server closed"), None])
+        processed = self.run_worker(close_old_connections=close_old_connections)
+        self.assertEqual(processed, [1, 2, 3])
+        self.assertEqual(close_old_connections.call_count, 2)
+
+    def test_failure_after_a_job_requeues_the_rest_of_the_batch(self):
+        with mock.patch.object(
+            DrainingJobQueue, "mark_job_done", side_effect=[OSError("lost"), None, None]
+        ):
+            processed = self.run_worker(close_old_connections=mock.Mock())
+        self.assertEqual(processed, [1, 2, 3])
+
+
+def strptime_loop(value: str):
+    """Date parsing the way validate_datetime did it before, every format tried in order"""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+class ValidateDatetimeIsoTests(SimpleTestCase):
+    def assert_parses(self, value: str, expected: datetime):
+        self.assertEqual(
+            ReconciliationEngine.validate_datetime(value, "datetime"), (True, "", expected)
+        )
+        self.assertEqual(strptime_loop(value), expected)
+
+    def assert_invalid(self, value: str):
+        self.assertEqual(
+            ReconciliationEngine.validate_datetime(value, "datetime"),
+            (False, f"Invalid datetime format '{value}'", None),
+        )
+        self.assertIsNone(strptime_loop(value))
+
+    def test_date_only(self):
+        self.assert_parses("2024-01-02", datetime(2024, 1, 2))
+        self.assert_parses("2024-02-29", datetime(2024, 2, 29))
+
+    def test_space_and_t_separators(self):
+        self.assert_parses("2024-01-02 03:04:05", datetime(2024, 1, 2, 3, 4, 5))
+        self.assert_parses("2024-01-02T03:04:05", datetime(2024, 1, 2, 3, 4, 5))
+
+    def test_fractional_seconds(self):
+        self.assert_parses("2024-01-02 03:04:05.1", datetime(2024, 1, 2, 3, 4, 5, 100000))
+        self.assert_parses("2024-01-02 03:04:05.123456", datetime(2024, 1, 2, 3, 4, 5, 123456))
+        # No format takes a fraction after T or more than six digits, fromisoformat would
+        self.assert_invalid("2024-01-02T03:04:05.123")
+        self.assert_invalid("2024-01-02 03:04:05.1234567")
+
+    def test_utc_designator_and_offsets(self):
+        # fromisoformat would return aware datetimes, no format accepts a zone
+        self.assert_invalid("2024-01-02T03:04:05Z")
+        self.assert_invalid("2024-01-02T03:04:05+01:00")
+        self.assert_invalid("2024-01-02 03:04:05-05:30")
+        self.assert_invalid("2024-01-02Z")
+
+    def test_iso_shaped_but_not_on_the_calendar(self):
+        for value in (
+            "2024-02-30",
+            "2023-02-29",
+            "2024-13-01",
+            "2024-00-10",
+            "2024-01-02 24:00:00",
+            "2024-01-02T23:60:00",
+            "2024-01-02 23:59:60",
+        ):
+            with self.subTest(value):
+                self.assert_invalid(value)
+
+    def test_values_outside_the_fast_path(self):
+        # Single-digit parts don't match the ISO shape and still parse through strptime
+        self.assert_parses("2024-1-2", datetime(2024, 1, 2))
+        self.assert_invalid(" 2024-01-02")
+
+
+class ValidationErrorCapTests(SimpleTestCase):
+    SENTINEL = f"... and more errors (showing first {MAX_VALIDATION_ERRORS})"
+
+    def setUp(self):
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def reconcile(self, source_invalid: int, target_invalid: int):
+        paths = []
+        for name, invalid in (("source.csv", source_invalid), ("target.csv", target_invalid)):
+            rows = [f"{i},{'x' if i < invalid else i}" for i in range(invalid + 10)]
+            path = self.directory / name
+            path.write_text("id,amount\n" + "\n".join(rows) + "\n")
+            paths.append(str(path))
+        return run_reconciliation(*paths, "id", {"id": "string", "amount": "integer"})
+
+    def assert_capped(self, errors):
+        self.assertEqual(len(errors), MAX_VALIDATION_ERRORS + 1)
+        self.assertEqual(errors.count(self.SENTINEL), 1)
+        self.assertEqual(errors[-1], self.SENTINEL)
+
+    def test_source_and_target_together_over_the_cap(self):
+        errors, results = self.reconcile(60, 60)
+        self.assertIsNone(results)
+        self.assert_capped(errors)
+        wheres = [error["where"] for error in errors[:-1]]
+        self.assertEqual(wheres, ["source file"] * 60 + ["target file"] * 40)
+
+    def test_source_alone_over_the_cap(self):
+        errors, results = self.reconcile(150, 60)
+        self.assertIsNone(results)
+        self.assert_capped(errors)
+        self.assertEqual({error["where"] for error in errors[:-1]}, {"source file"})
+
+    def test_under_the_cap(self):
+        errors, results = self.reconcile(30, 30)
+        self.assertIsNone(results)
+        self.assertEqual(len(errors), 60)
+        self.assertNotIn(self.SENTINEL, errors)
+
+
+class FieldTypeMapCacheTests(TestCase):
+    def setUp(self):
+        field_type_map_for_ruleset.cache_clear()
+        self.addCleanup(field_type_map_for_ruleset.cache_clear)
+        self.ruleset = Ruleset.objects.create(name="Payments", match_key="id")
+        self.amount = RulesetField.objects.create(
+            ruleset=self.ruleset, field_name="amount", data_type="string"
+        )
+        RulesetField.objects.create(ruleset=self.ruleset, field_name="id", data_type="string")
+
+    def next_job_field_types(self):
+        """The field type map a worker resolves for a newly submitted job"""
+        job = ReconciliationJob.objects.create(ruleset=self.ruleset)
+        job = ReconciliationJob.objects.select_related("ruleset").get(id=job.id)
+        return ReconciliationEngine().get_field_type_map(job)
+
+    def test_cached_between_jobs(self):
+        self.assertEqual(self.next_job_field_types(), {"amount": "string", "id": "string"})
+        job = ReconciliationJob.objects.select_related("ruleset").get(ruleset=self.ruleset)
+        with self.assertNumQueries(0):
+            ReconciliationEngine().get_field_type_map(job)
+
+    def test_edited_field(self):
+        self.assertEqual(self.next_job_field_types()["amount"], "string")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.amount.data_type = "float"
+            self.amount.save()
+        self.assertEqual(self.next_job_field_types()["amount"], "float")
+
+    def test_ruleset_update_through_the_api(self):
+        self.assertEqual(self.next_job_field_types()["amount"], "string")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = APIClient().put(
+                f"/api/v1/rulesets/{self.ruleset.id}/",
+                {
+                    "name": "Payments",
+                    "match_key": "id",
+                    "fields": [
+                        {"field_name": "id", "data_type": "string"},
+                        {"field_name": "amount", "data_type": "integer"},
+                        {"field_name": "paid_on", "data_type": "date"},
+                    ],
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            self.next_job_field_types(), {"amount": "integer", "id": "string", "paid_on": "date"}
+        )
+
+
+class DateFormatSeparatorTests(SimpleTestCase):
+    # Day above 12 so day-first and month-first formats can't both read the sample
+    SAMPLE = datetime(2024, 1, 23, 4, 5, 6, 789000)
+
+    def test_every_format_is_in_one_bucket(self):
+        bucketed = [fmt for formats in DATE_FORMATS_BY_SEPARATORS.values() for fmt in formats]
+        self.assertCountEqual(bucketed, DATE_FORMATS)
+
+    def test_every_format_still_parses(self):
+        for fmt in DATE_FORMATS:
+            value = self.SAMPLE.strftime(fmt)
+            with self.subTest(fmt=fmt, value=value):
+                parsed, error, date = ReconciliationEngine.validate_datetime(value, "datetime")
+                self.assertEqual((parsed, error), (True, ""))
+                self.assertEqual(date, datetime.strptime(value, fmt))
+                self.assertEqual(date, strptime_loop(value))
+
+    def test_ambiguous_values_resolve_like_the_ordered_loop(self):
+        for value, expected in (
+            # Month first wins over day first, as %m/%d/%Y comes before %d/%m/%Y
+            ("01/02/2024", datetime(2024, 1, 2)),
+            ("13/02/2024", datetime(2024, 2, 13)),
+            ("02/13/2024", datetime(2024, 2, 13)),
+            ("2024/01/02", datetime(2024, 1, 2)),
+            ("01.02.2024", datetime(2024, 2, 1)),
+            ("01-02-2024", datetime(2024, 2, 1)),
+            ("2024-01-02", datetime(2024, 1, 2)),
+            ("20240102", datetime(2024, 1, 2)),
+            ("01-02-2024 03:04:05", datetime(2024, 2, 1, 3, 4, 5)),
+        ):
+            with self.subTest(value):
+                self.assertEqual(strptime_loop(value), expected)
+                self.assertEqual(
+                    ReconciliationEngine.validate_datetime(value, "datetime"), (True, "", expected)
+                )
+
+    def test_invalid_values_stay_invalid(self):
+        for value in ("01/13/2024x", "2024.01.02", "01:02:2024", "2024/01-02", "today", "1/2"):
+            with self.subTest(value):
+                self.assertIsNone(strptime_loop(value))
+                self.assertFalse(ReconciliationEngine.validate_datetime(value, "datetime")[0])
+
+
+class NormalizeNumberFieldTests(SimpleTestCase):
+    # Plain decimals the regex fast path converts itself
+    FAST_PATH = ("1.5", "1.2345", ".5", "0.99", "1234.56", "12.345678")
+    # Left to price_parser: a three-digit fraction reads as a thousands separator there, and
+    # signs, currency symbols and grouping need its parsing
+    PRICE_PARSER = (
+        "1.234",
+        "12.",
+        "-3.10",
+        "$1.50",
+        "€12.99",
+        "£1,234.56",
+        "1.234,56 €",
+        "₹ 99.5",
+        "-$3.10",
+    )
+
+    def assert_matches_price_parser(self, value: str):
+        amount = Price.fromstring(value).amount
+        self.assertIsNotNone(amount)
+        for field_type, convert in (("float", float), ("integer", int)):
+            normalized = ReconciliationEngine.normalize_number_field(value, field_type)
+            self.assertEqual(normalized, convert(amount))
+            self.assertIs(type(normalized), convert)
+
+    def test_matches_price_parser(self):
+        for value in self.FAST_PATH + self.PRICE_PARSER:
+            with self.subTest(value):
+                self.assert_matches_price_parser(value)
+
+    def test_thousands_separator_and_sign(self):
+        normalize = ReconciliationEngine.normalize_number_field
+        self.assertEqual(normalize("1.234"), 1234.0)
+        self.assertEqual(normalize("1.2345"), 1.2345)
+        # price_parser drops the sign, kept as it was
+        self.assertEqual(normalize("-3.10"), 3.1)
+
+    def test_fast_path_skips_price_parser(self):
+        with mock.patch("reconciliation_app.reconciliation_engine.Price", wraps=Price) as price:
+            for value in self.FAST_PATH:
+                ReconciliationEngine.normalize_number_field(value)
+            price.fromstring.assert_not_called()
+            for value in self.PRICE_PARSER:
+                ReconciliationEngine.normalize_number_field(value)
+            self.assertEqual(price.fromstring.call_count, len(self.PRICE_PARSER))
+
+
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ReconciliationJob.objects.bulk_create(ReconciliationJob() for _ in range(119))
+        cls.job = ReconciliationJob.objects.create()
+        ReconciliationResult.objects.bulk_create(
+            ReconciliationResult(job=cls.job, result_type="matched", match_key=str(i))
+            for i in range(120)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get_page(self, url: str, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        page = response.json()
+        self.assertEqual(set(page), {"count", "next", "previous", "results"})
+        self.assertEqual(page["count"], 120)
+        return page
+
+    def test_page_sizes(self):
+        for url in ("/api/v1/jobs/", f"/api/v1/jobs/{self.job.id}/results/"):
+            for page_size, expected in (
+                (None, 50),
+                ("20", 20),
+                ("100", 100),
+                ("500", 100),
+                ("0", 50),
+                ("-5", 50),
+                ("lots", 50),
+            ):
+                with self.subTest(url=url, page_size=page_size):
+                    params = {} if page_size is None else {"page_size": page_size}
+                    self.assertEqual(len(self.get_page(url, **params)["results"]), expected)
+
+    def test_job_list_envelope(self):
+        page = self.get_page("/api/v1/jobs/")
+        self.assertIsNone(page["previous"])
+        self.assertIn("page=2", page["next"])
+        self.assertEqual(page["results"][0]["id"], str(self.job.id))
+
+        last = self.get_page("/api/v1/jobs/", page=2, page_size=100)
+        self.assertEqual(len(last["results"]), 20)
+        self.assertIsNone(last["next"])
+        self.assertIn("page_size=100", last["previous"])
+
+    def test_results_pages_follow_id_order(self):
+        url = f"/api/v1/jobs/{self.job.id}/results/"
+        match_keys = [
+            result["match_key"]
+            for page in (1, 2, 3)
+            for result in self.get_page(url, page=page)["results"]
+        ]
+        self.assertEqual(match_keys, [str(i) for i in range(120)])
+
+
+class RulesetSerializerTests(TestCase):
+    @staticmethod
+    def fields(count: int):
+        return [{"field_name": f"field_{i}", "data_type": "string"} for i in range(count)]
+
+    def ruleset_data(self, fields):
+        return {"name": "Payments", "match_key": "field_0", "fields": fields}
+
+    def test_duplicate_field_rolls_back_the_ruleset(self):
+        serializer = RulesetSerializer(data=self.ruleset_data(self.fields(10) + self.fields(1)))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaises(IntegrityError):
+            serializer.save()
+        self.assertFalse(Ruleset.objects.exists())
+        self.assertFalse(RulesetField.objects.exists())
+
+    def test_duplicate_field_on_update_keeps_the_old_fields(self):
+        ruleset = RulesetSerializer(data=self.ruleset_data(self.fields(2)))
+        self.assertTrue(ruleset.is_valid(), ruleset.errors)
+        ruleset = ruleset.save()
+        data = self.ruleset_data(self.fields(10) + self.fields(1))
+        data["name"] = "Renamed"
+        serializer = RulesetSerializer(ruleset, data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaises(IntegrityError):
+            serializer.save()
+        ruleset = Ruleset.objects.get()
+        self.assertEqual(ruleset.name, "Payments")
+        self.assertEqual(
+            list(ruleset.fields.values_list("field_name", flat=True)), ["field_0", "field_1"]
+        )
+
+    def test_create_queries(self):
+        # Uniqueness check, ruleset insert, one insert for all fields, fields for the response,
+        # and the savepoint pair of the transaction
+        for count in (1, 10, 50):
+            with self.subTest(fields=count):
+                data = self.ruleset_data(self.fields(count))
+                data["name"] = f"Payments {count}"
+                with self.assertNumQueries(6):
+                    response = APIClient().post("/api/v1/rulesets/", data, format="json")
+                self.assertEqual(response.status_code, 201, response.content)
+                self.assertEqual(len(response.json()["fields"]), count)
+
+    def test_update_queries(self):
+        ruleset = Ruleset.objects.create(name="Payments", match_key="field_0")
+        RulesetField.objects.bulk_create(
+            RulesetField(ruleset=ruleset, field_name=f"old_{i}") for i in range(10)
+        )
+        for count in (1, 10, 50):
+            with self.subTest(fields=count):
+                with self.assertNumQueries(9):
+                    response = APIClient().put(
+                        f"/api/v1/rulesets/{ruleset.id}/",
+                        self.ruleset_data(self.fields(count)),
+                        format="json",
+                    )
+                self.assertEqual(response.status_code, 200, response.content)
+                self.assertEqual(ruleset.fields.count(), count)
@@ -1,5 +1,7 @@
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
 
 from django.db.models import Count
 from drf_yasg import openapi
@@ -10,39 +12,90 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-logger = logging.getLogger("reconciliation_app.api")
+from .exceptions import error_details
 from .models import ReconciliationJob, ReconciliationResult, Ruleset
 from .queue_manager import job_manager
 from .serializers import (
+    CSV_SCAN_CHUNK_SIZE,
+    CsvScan,
     JobResultsSerializer,
     ReconciliationJobDetailSerializer,
     ReconciliationJobSerializer,
     RulesetListSerializer,
     RulesetSerializer,
+    is_csv_file,
 )
 
+logger = logging.getLogger("reconciliation_app.api")
+
+# Columns the job serializers read, the ruleset's are fetched in the same query
+JOB_DETAIL_FIELDS = (
+    "id",
+    "status",
+    "created_at",
+    "updated_at",
+    "result_summary",
+    "error_message",
+    "ruleset__id",
+    "ruleset__name",
+    "ruleset__match_key",
+)
+JOB_LIST_FIELDS = (
+    "id",
+    "source_file",
+    "target_file",
+    "status",
+    "created_at",
+    "updated_at",
+    "result_summary",
+    "error_message",
+    "ruleset__id",
+    "ruleset__name",
+)
+
+# Values of result_type a results page can be filtered by, anything else is ignored
+RESULT_TYPES = frozenset(result_type for result_type, _ in ReconciliationResult.RESULT_TYPE_CHOICES)
+
+
+class ReconciliationPagination(PageNumberPagination):
+    """Page numbers with a page_size query parameter, invalid sizes fall back to the default"""
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+def save_csv_file(uploaded_file, path) -> CsvScan:
+    """Write an uploaded CSV to path, scanning its rows from the same chunks"""
+    scan = CsvScan(path)
+    if hasattr(uploaded_file, "temporary_file_path") and hasattr(os, "posix_fadvise"):
+        # Disk-backed upload, let the kernel read ahead of the 1MB chunks more aggressively. The
+        # hint belongs to the open file, chunks() below reads through this same descriptor
+        os.posix_fadvise(uploaded_file.file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    with open(path, "wb") as f:
+        for chunk in uploaded_file.chunks(CSV_SCAN_CHUNK_SIZE):
+            f.write(chunk)
+            scan.feed(chunk)
+    return scan
 
-def save_csv_files_to_job_directory(job, source_file, target_file):
-    """Save CSV files to job-specific directory"""
-    try:
-        job_dir = job.get_job_directory()
-        os.makedirs(job_dir, exist_ok=True)
 
-        source_path = job.get_source_file_path()
-        with open(source_path, "wb") as f:
-            for chunk in source_file.chunks():
-                f.write(chunk)
+def save_csv_files_to_job_directory(job, source_file, target_file) -> Tuple[CsvScan, CsvScan]:
+    """Save CSV files to job-specific directory, returning the scans made while writing them"""
+    try:
+        job.job_directory.mkdir(parents=True, exist_ok=True)
 
-        target_path = job.get_target_file_path()
-        with open(target_path, "wb") as f:
-            for chunk in target_file.chunks():
-                f.write(chunk)
+        source_path = job.source_file_path_abs
+        target_path = job.target_file_path_abs
+        # The files are independent, write them side by side while either waits on I/O
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            source_save = executor.submit(save_csv_file, source_file, source_path)
+            target_save = executor.submit(save_csv_file, target_file, target_path)
+            scans = source_save.result(), target_save.result()
 
-        job.source_file_path = source_path
-        job.target_file_path = target_path
-        job.save()
+        job.source_file_path = str(source_path)
+        job.target_file_path = str(target_path)
 
-        return True
+        return scans
 
     except Exception as e:
         raise ValueError(f"Failed to save files: {str(e)}")
@@ -99,37 +152,51 @@ class ReconcileCSVFilesView(APIView):
             return Response({"error": "ruleset_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         # Validate file types
-        if not source_file.name.endswith(".csv") or not target_file.name.endswith(".csv"):
+        if not (is_csv_file(source_file) and is_csv_file(target_file)):
             logger.warning(f"Invalid file types: {source_file.name}, {target_file.name}")
             return Response(
                 {"error": "Both files must be CSV files"}, status=status.HTTP_400_BAD_REQUEST
             )
 
         try:
-            ruleset = Ruleset.objects.get(id=ruleset_id)
+            ruleset = Ruleset.objects.only("id", "name", "match_key").get(id=ruleset_id)
             logger.debug(f"Using ruleset: {ruleset.name}")
         except Ruleset.DoesNotExist:
             logger.error(f"Ruleset {ruleset_id} not found")
             return Response({"error": "Ruleset not found"}, status=status.HTTP_400_BAD_REQUEST)
 
+        # The job's id is set before its row is inserted, so the uploads are saved to its
+        # directory and scanned for validation in a single read
+        job = ReconciliationJob(ruleset=ruleset, status="pending")
+        try:
+            source_scan, target_scan = save_csv_files_to_job_directory(
+                job, source_file, target_file
+            )
+            logger.debug(f"Saved CSV files for job {job.id}")
+        except Exception as e:
+            logger.error(f"Failed to create reconciliation job: {e}")
+            job.cleanup_files(logger=logger)
+            return Response(
+                {"error": f"Failed to create job: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
         validation_result = ReconciliationJobSerializer.validate_and_count_csv_files(
-            source_file, target_file, ruleset
+            source_scan, target_scan, ruleset
         )
 
         if not validation_result["success"]:
             logger.error(f"CSV validation failed: {validation_result['error']}")
+            job.cleanup_files(logger=logger)
             return Response(
                 {"error": validation_result["error"]}, status=status.HTTP_400_BAD_REQUEST
             )
 
         try:
             # Create reconciliation job with ruleset
-            job = ReconciliationJob.objects.create(
-                ruleset=ruleset,
-                status="pending",
-                source_record_count=validation_result["source_count"],
-                target_record_count=validation_result["target_count"],
-            )
+            job.source_record_count = validation_result["source_count"]
+            job.target_record_count = validation_result["target_count"]
+            job.save(force_insert=True)
 
             logger.info(
                 f"Created job {job.id} with ruleset {ruleset.name} - "
@@ -137,9 +204,6 @@ class ReconcileCSVFilesView(APIView):
                 f"Target: {validation_result['target_count']} records"
             )
 
-            save_csv_files_to_job_directory(job, source_file, target_file)
-            logger.debug(f"Saved CSV files for job {job.id}")
-
             if job_manager.submit_job(job.id):
                 logger.info(f"Job {job.id} successfully queued for processing")
                 response_data = {
@@ -156,8 +220,8 @@ class ReconcileCSVFilesView(APIView):
             else:
                 logger.error(f"Failed to submit job {job.id} to queue")
                 job.status = "failed"
-                job.error_message = "Failed to submit job to queue"
-                job.save()
+                job.error_message = error_details("QueueError", "Failed to submit job to queue")
+                job.save(update_fields=["status", "error_message", "updated_at"])
                 return Response(
                     {"error": "Failed to submit job to processing queue"},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -182,7 +246,11 @@ class ReconciliationJobDetailView(APIView):
     def get(self, request, job_id):
         logger.debug(f"Job details requested for job {job_id}")
         try:
-            job = ReconciliationJob.objects.get(id=job_id)
+            job = (
+                ReconciliationJob.objects.select_related("ruleset")
+                .only(*JOB_DETAIL_FIELDS)
+                .get(id=job_id)
+            )
             logger.debug(f"Job {job_id} found with status: {job.status}")
             serializer = ReconciliationJobDetailSerializer(job)
             return Response(serializer.data)
@@ -193,13 +261,33 @@ class ReconciliationJobDetailView(APIView):
 
 class ReconciliationJobListView(APIView):
     @swagger_auto_schema(
-        operation_description="List all reconciliation jobs",
+        operation_description="List reconciliation jobs, newest first, a page at a time",
+        manual_parameters=[
+            openapi.Parameter(
+                "page", openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                "page_size",
+                openapi.IN_QUERY,
+                description="Number of jobs per page (max 100)",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
         responses={200: openapi.Response("List of jobs", ReconciliationJobSerializer(many=True))},
     )
     def get(self, request):
-        jobs = ReconciliationJob.objects.all()
-        serializer = ReconciliationJobSerializer(jobs, many=True)
-        return Response(serializer.data)
+        jobs = (
+            ReconciliationJob.objects.select_related("ruleset")
+            .only(*JOB_LIST_FIELDS)
+            .order_by("-created_at")
+        )
+
+        paginator = ReconciliationPagination()
+        paginated_jobs = paginator.paginate_queryset(jobs, request)
+
+        serializer = ReconciliationJobSerializer(paginated_jobs, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
 
 
 class JobResultsView(APIView):
@@ -237,25 +325,19 @@ class JobResultsView(APIView):
             f"type: {result_type}, page: {page}, page_size: {page_size}"
         )
 
-        try:
-            job = ReconciliationJob.objects.get(id=job_id)
-        except ReconciliationJob.DoesNotExist:
+        if not ReconciliationJob.objects.filter(id=job_id).exists():
             logger.warning(f"Job {job_id} not found for results request")
             return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        queryset = ReconciliationResult.objects.filter(job=job).order_by("id")
-        total_results = queryset.count()
+        queryset = ReconciliationResult.objects.filter(job_id=job_id)
 
-        if result_type and result_type in [
-            "matched",
-            "unmatched_source",
-            "unmatched_target",
-            "duplicate",
-        ]:
+        if result_type in RESULT_TYPES:
             queryset = queryset.filter(result_type=result_type)
 
-        paginator = PageNumberPagination()
-        paginator.page_size = page_size
+        # The paginator counts the filtered results itself
+        queryset = queryset.order_by("id")
+
+        paginator = ReconciliationPagination()
         paginated_results = paginator.paginate_queryset(queryset, request)
 
         serializer = JobResultsSerializer(paginated_results, many=True)
@@ -266,6 +348,15 @@ class JobResultsView(APIView):
 class RulesetViewSet(viewsets.ModelViewSet):
     queryset = Ruleset.objects.all()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            # Aggregating drops the model's default ordering, restore it for pagination
+            queryset = queryset.annotate(fields_count=Count("fields")).order_by(
+                *Ruleset._meta.ordering
+            )
+        return queryset
+
     def get_serializer_class(self):
         if self.action == "list":
             return RulesetListSerializer